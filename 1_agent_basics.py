@@ -1,17 +1,30 @@
+import sqlite3
 from typing import Annotated, TypedDict
 
 from dotenv import load_dotenv
-from IPython.display import Image, display
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
-from langchain_core.messages.utils import trim_messages
 from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import MessagesState, add_messages
 
+from graph_cache import show_graph
+
 load_dotenv()
 
+# Single LLM client shared by all examples (one connection pool)
+llm = ChatOpenAI(model="gpt-4o-mini")
+
+
+def sqlite_checkpointer(path: str = "chat.db") -> SqliteSaver:
+    """SQLite checkpointer (WAL journal), keeps checkpoints on disk and across restarts"""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return SqliteSaver(conn)
+
 
 # ==============================================================
 # Example 1: Simple LLM Call (No Graph)
@@ -19,8 +32,6 @@ load_dotenv()
 # - Direct LLM invocation without graph structure
 # - Single message, no state management
 
-llm = ChatOpenAI(model="gpt-4o-mini")
-
 message = "What is the capital of France?"
 response = llm.invoke([HumanMessage(content=message)])
 print(f"AI: {response.content}\n")
@@ -32,8 +43,6 @@ print(f"AI: {response.content}\n")
 # - Basic graph: State → Node → Edges → Compile → Invoke
 # - Single invocation, no conversation history
 
-llm = ChatOpenAI(model="gpt-4o-mini")
-
 
 class AgentState(TypedDict):
     """State schema: list of messages"""
@@ -59,69 +68,16 @@ response = agent.invoke({"messages": [HumanMessage(content=message)]})
 print(f"AI: {response['messages'][-1].content}\n")
 
 # Visualize
-display(Image(agent.get_graph().draw_mermaid_png()))
+show_graph(agent)
 
 
 # ==============================================================
-# Example 3: Chat Agent with Short-Term Memory (Manual)
+# Example 3: Chat Agent with Short-Term Memory (add_messages)
 # ==============================================================
-# - Uses add_messages reducer
-# - Manually maintains conversation history in memory
-# - No checkpointer, state lost when loop exits
-
-llm = ChatOpenAI(model="gpt-4o-mini")
-
-
-class AgentState(TypedDict):
-    """State schema: list of messages with add_messages reducer"""
-
-    messages: Annotated[list[BaseMessage], add_messages]
-
-
-def call_llm(state: AgentState) -> dict:
-    """Node: calls LLM and returns response"""
-    response = llm.invoke(state["messages"])
-    return {"messages": [response]}
-
-
-# Build graph
-graph = StateGraph(AgentState)
-graph.add_node("llm", call_llm)
-graph.add_edge(START, "llm")
-graph.add_edge("llm", END)
-
-# Compile
-agent = graph.compile()
-
-# Chat loop: manually maintain conversation history
-history = {"messages": [SystemMessage(content="You are a helpful assistant.")]}
-
-while True:
-    user_input = input("Enter: ")
-    if user_input.lower() == "exit":
-        break
-
-    # Add user message to history
-    history["messages"].append(HumanMessage(content=user_input))  # type: ignore
-
-    # Invoke with full history
-    response = agent.invoke({"messages": history["messages"]})  # type: ignore
-
-    # Update history with full conversation
-    history["messages"] = response["messages"]
-
-    print(f"User: {user_input}")
-    print(f"AI: {response['messages'][-1].content}\n")
-
-
-# ==============================================================
-# Example 4: Chat Agent with Short-Term Memory (InMemorySaver)
-# ==============================================================
-# - Uses InMemorySaver to persist state per thread_id
-# - Only pass new messages, checkpointer handles history
-# - Custom state definition with add_messages reducer
-
-llm = ChatOpenAI(model="gpt-4o-mini")
+# - Uses add_messages reducer to append each turn to the history
+# - InMemorySaver keeps the history per thread_id (no manual bookkeeping)
+# - Only pass new messages, state lost when the process exits
+# - Streams the reply token by token (stream_mode="messages")
 
 
 class AgentState(TypedDict):
@@ -143,35 +99,38 @@ graph.add_edge(START, "llm")
 graph.add_edge("llm", END)
 
 # Compile with checkpointer
-memory = InMemorySaver()
-agent = graph.compile(checkpointer=memory)
+agent = graph.compile(checkpointer=InMemorySaver())
 
 # Thread ID tracks conversation
-config: RunnableConfig = {"configurable": {"thread_id": "conversation-1"}}
+config: RunnableConfig = {"configurable": {"thread_id": "ex3"}}
 
 # Initialize conversation
 agent.invoke({"messages": [SystemMessage(content="You are a helpful assistant.")]}, config)
 
-# Chat loop: only pass new messages, checkpointer handles history
+# Chat loop: only pass new messages, add_messages appends them to the stored history
 while True:
     user_input = input("Enter: ")
     if user_input.lower() == "exit":
         break
 
-    response = agent.invoke({"messages": [HumanMessage(content=user_input)]}, config)
-
     print(f"User: {user_input}")
-    print(f"AI: {response['messages'][-1].content}\n")
+    print("AI: ", end="", flush=True)
+
+    # Stream tokens as they are generated | "messages" mode yields (chunk, metadata)
+    inputs = {"messages": [HumanMessage(content=user_input)]}
+    for chunk, _ in agent.stream(inputs, config, stream_mode="messages"):  # type: ignore
+        print(chunk.content, end="", flush=True)
+    print("\n")
 
 
 # ==============================================================
-# Example 5: Chat Agent with Short-Term Memory (MessagesState)
+# Examples 4 & 5: Chat Agent with Short-Term Memory (SqliteSaver)
 # ==============================================================
-# - Same as Example 4 but uses built-in MessagesState
-# - No custom state definition needed
-# - InMemorySaver persists state per thread_id
-
-llm = ChatOpenAI(model="gpt-4o-mini")
+# - Uses SqliteSaver to persist state per thread_id (on disk, survives restarts)
+# - Only pass new messages, checkpointer handles history
+# - Custom add_messages state (Ex. 4) and built-in MessagesState (Ex. 5) are equivalent:
+#   MessagesState is a TypedDict with a single messages list that uses the add_messages reducer
+#   -> One graph is built with MessagesState and compiled once for both
 
 
 def call_llm(state: MessagesState) -> dict:
@@ -187,14 +146,15 @@ graph.add_edge(START, "llm")
 graph.add_edge("llm", END)
 
 # Compile with checkpointer
-memory = InMemorySaver()
+memory = sqlite_checkpointer()
 agent = graph.compile(checkpointer=memory)
 
 # Thread ID tracks conversation
-config: RunnableConfig = {"configurable": {"thread_id": "conversation-1"}}
+config: RunnableConfig = {"configurable": {"thread_id": "ex4"}}
 
-# Initialize conversation
-agent.invoke({"messages": [SystemMessage(content="You are a helpful assistant.")]}, config)
+# Initialize conversation (skipped when resuming a stored thread)
+if not agent.get_state(config).values:
+    agent.invoke({"messages": [SystemMessage(content="You are a helpful assistant.")]}, config)
 
 # Chat loop: only pass new messages, checkpointer handles history
 while True:
@@ -202,19 +162,24 @@ while True:
     if user_input.lower() == "exit":
         break
 
-    response = agent.invoke({"messages": [HumanMessage(content=user_input)]}, config)
-
     print(f"User: {user_input}")
-    print(f"AI: {response['messages'][-1].content}\n")
+    print("AI: ", end="", flush=True)
+
+    # Stream tokens as they are generated | "messages" mode yields (chunk, metadata)
+    inputs = {"messages": [HumanMessage(content=user_input)]}
+    for chunk, _ in agent.stream(inputs, config, stream_mode="messages"):  # type: ignore
+        print(chunk.content, end="", flush=True)
+    print("\n")
+
 
 # ==============================================================
 # Example 6: Chat Agent with Short-Term Memory (Trim Messages)
 # ==============================================================
 # - Trims message history to last 5 messages before LLM call
-# - Always keeps system message (include_system=True)
-# - InMemorySaver persists full history, trim only for LLM
+# - Always keeps system message (counts towards the 5)
+# - SqliteSaver persists full history, trim only for LLM
 
-llm = ChatOpenAI(model="gpt-4o-mini")
+MAX_MESSAGES = 5
 
 
 class AgentState(TypedDict):
@@ -228,14 +193,11 @@ def call_llm(state: AgentState) -> dict:
 
     full_history = state["messages"]
 
-    trimmed_history = trim_messages(
-        full_history,
-        max_tokens=5,  # Keep last 5 messages
-        strategy="last",  # Keep most recent
-        token_counter=len,  # Count messages (not tokens)
-        include_system=True,  # Always keep system message
-        allow_partial=False,
-    )
+    # Slice-based trim: system message(s) + most recent messages, 5 in total
+    system_msgs = [msg for msg in full_history if isinstance(msg, SystemMessage)]
+    other_msgs = [msg for msg in full_history if not isinstance(msg, SystemMessage)]
+    keep = max(MAX_MESSAGES - len(system_msgs), 0)
+    trimmed_history = system_msgs + other_msgs[max(len(other_msgs) - keep, 0) :]
 
     response = llm.invoke(trimmed_history)
     return {"messages": [response]}
@@ -248,14 +210,15 @@ graph.add_edge(START, "llm")
 graph.add_edge("llm", END)
 
 # Compile with checkpointer
-memory = InMemorySaver()
+memory = sqlite_checkpointer()
 agent = graph.compile(checkpointer=memory)
 
 # Thread ID tracks conversation
-config: RunnableConfig = {"configurable": {"thread_id": "conversation-1"}}
+config: RunnableConfig = {"configurable": {"thread_id": "ex6"}}
 
-# Initialize conversation
-agent.invoke({"messages": [SystemMessage(content="You are a helpful assistant.")]}, config)
+# Initialize conversation (skipped when resuming a stored thread)
+if not agent.get_state(config).values:
+    agent.invoke({"messages": [SystemMessage(content="You are a helpful assistant.")]}, config)
 
 # Chat loop: only pass new messages, checkpointer handles history
 while True:
@@ -263,7 +226,11 @@ while True:
     if user_input.lower() == "exit":
         break
 
-    response = agent.invoke({"messages": [HumanMessage(content=user_input)]}, config)
-
     print(f"User: {user_input}")
-    print(f"AI: {response['messages'][-1].content}\n")
+    print("AI: ", end="", flush=True)
+
+    # Stream tokens as they are generated | "messages" mode yields (chunk, metadata)
+    inputs = {"messages": [HumanMessage(content=user_input)]}
+    for chunk, _ in agent.stream(inputs, config, stream_mode="messages"):  # type: ignore
+        print(chunk.content, end="", flush=True)
+    print("\n")
@@ -1,11 +1,16 @@
+import math
+import operator
 import random
-from typing import Literal
+from typing import Annotated, Literal, TypedDict
 
 from dotenv import load_dotenv
-from IPython.display import Image, display
+from langgraph.cache.memory import InMemoryCache
 from langgraph.graph import END, START, StateGraph
+from langgraph.types import CachePolicy
 from pydantic import BaseModel, Field
 
+from graph_cache import show_graph
+
 load_dotenv()
 
 
@@ -29,18 +34,19 @@ def greeting_node(state: AgentState) -> AgentState:
 
 graph = StateGraph(AgentState)
 
-graph.add_node("greeting", greeting_node)
+# Pure node (output depends only on input state) | Cached result reused on repeat input
+graph.add_node("greeting", greeting_node, cache_policy=CachePolicy())
 graph.add_edge(START, "greeting")
 graph.add_edge("greeting", END)
 
-graph = graph.compile()
+graph = graph.compile(cache=InMemoryCache())
 
 message = AgentState(user_name="John")  # type: ignore
 response = graph.invoke(message)
 print(response["result"])
 
 # Display the graph
-display(Image(graph.get_graph().draw_mermaid_png()))
+show_graph(graph)
 
 
 # --------------------------------------------------------------
@@ -63,18 +69,18 @@ def process_values_node(state: AgentState) -> AgentState:
 
 graph = StateGraph(AgentState)
 
-graph.add_node("process_values", process_values_node)
+graph.add_node("process_values", process_values_node, cache_policy=CachePolicy())
 graph.set_entry_point("process_values")
 graph.set_finish_point("process_values")
 
-graph = graph.compile()
+graph = graph.compile(cache=InMemoryCache())
 
 message = AgentState(values=[1, 2, 3], name="John")  # type: ignore
 response = graph.invoke(message)
 print(response["result"])
 
 # Display the graph
-display(Image(graph.get_graph().draw_mermaid_png()))
+show_graph(graph)
 
 
 # --------------------------------------------------------------
@@ -92,13 +98,12 @@ class AgentState(BaseModel):
 def process_values_node(state: AgentState) -> AgentState:
     """Simple node that processes the values in the list"""
 
+    # Built-in reductions: exact for any int size (C loop, no per-element bytecode)
     match state.operation:
         case "add":
             result = sum(state.values)
         case "multiply":
-            result = 1
-            for value in state.values:
-                result *= value
+            result = math.prod(state.values)
 
     state.result = f"Hello {state.name}! The result is {result}"
     return state
@@ -106,18 +111,18 @@ def process_values_node(state: AgentState) -> AgentState:
 
 graph = StateGraph(AgentState)
 
-graph.add_node("process_values", process_values_node)
+graph.add_node("process_values", process_values_node, cache_policy=CachePolicy())
 graph.set_entry_point("process_values")
 graph.set_finish_point("process_values")
 
-graph = graph.compile()
+graph = graph.compile(cache=InMemoryCache())
 
 message = AgentState(values=[1, 2, 3, 8], name="John", operation="add")
 response = graph.invoke(message)
 print(response["result"])
 
 # Display the graph
-display(Image(graph.get_graph().draw_mermaid_png()))
+show_graph(graph)
 
 
 # --------------------------------------------------------------
@@ -160,23 +165,23 @@ def third_node(state: AgentState) -> AgentState:
 
 graph = StateGraph(AgentState)
 
-graph.add_node("first_node", first_node)
-graph.add_node("second_node", second_node)
-graph.add_node("third_node", third_node)
+graph.add_node("first_node", first_node, cache_policy=CachePolicy())
+graph.add_node("second_node", second_node, cache_policy=CachePolicy())
+graph.add_node("third_node", third_node, cache_policy=CachePolicy())
 
 graph.add_edge(START, "first_node")
 graph.add_edge("first_node", "second_node")
 graph.add_edge("second_node", "third_node")
 graph.add_edge("third_node", END)
 
-graph = graph.compile()
+graph = graph.compile(cache=InMemoryCache())
 
 message = AgentState(name="John", age=30, skills=["Python", "SQL", "Machine Learning"])  # type: ignore
 response = graph.invoke(message)
 print(response["result"])
 
 # Display the graph
-display(Image(graph.get_graph().draw_mermaid_png()))
+show_graph(graph)
 
 
 # --------------------------------------------------------------
@@ -227,8 +232,8 @@ def route_decision(state: AgentState) -> str:  # No modification of the state
 graph = StateGraph(AgentState)
 
 graph.add_node("router_node", router_node)  # or lambda state: state
-graph.add_node("add_node", add_node)
-graph.add_node("multiply_node", multiply_node)
+graph.add_node("add_node", add_node, cache_policy=CachePolicy())
+graph.add_node("multiply_node", multiply_node, cache_policy=CachePolicy())
 
 
 graph.add_edge(START, "router_node")
@@ -244,14 +249,14 @@ graph.add_conditional_edges(
 graph.add_edge("add_node", END)
 graph.add_edge("multiply_node", END)
 
-graph = graph.compile()
+graph = graph.compile(cache=InMemoryCache())
 
 message = AgentState(number1=10, number2=5, operation="add")
 response = graph.invoke(message)
 print(response["result"])
 
 # Display the graph
-display(Image(graph.get_graph().draw_mermaid_png()))
+show_graph(graph)
 
 # --------------------------------------------------------------
 # Simple Graph (Looping Logic)
@@ -260,28 +265,25 @@ display(Image(graph.get_graph().draw_mermaid_png()))
 
 class AgentState(TypedDict):
     name: str
-    numbers: list[int]
+    numbers: Annotated[list[int], operator.add]  # Reducer: nodes return only new numbers
     counter: int
     result: str
 
 
-def greeting_node(state: AgentState) -> AgentState:
+def greeting_node(state: AgentState) -> dict:
     """Simple node that adds a greeting message to the state"""
 
-    state["result"] = f"Hello {state['name']}! Welcome to the session!"
-    state["counter"] = 0
-
-    return state
+    # Partial update (returning the full state would re-append numbers via the reducer)
+    return {"result": f"Hello {state['name']}! Welcome to the session!", "counter": 0}
 
 
-def random_node(state: AgentState) -> AgentState:
+def random_node(state: AgentState) -> dict:
     """Simple node that generates a random number"""
 
     number = random.randint(1, 10)
-    state["numbers"].append(number)
-    state["counter"] += 1
 
-    return state
+    # Return the delta only | operator.add appends it to the stored list
+    return {"numbers": [number], "counter": state["counter"] + 1}
 
 
 def route_decision(state: AgentState) -> str:  # No modification of the state
@@ -297,7 +299,7 @@ def route_decision(state: AgentState) -> str:  # No modification of the state
 
 graph = StateGraph(AgentState)
 
-graph.add_node("greeting_node", greeting_node)
+graph.add_node("greeting_node", greeting_node, cache_policy=CachePolicy())
 graph.add_node("random_node", random_node)
 
 graph.add_edge(START, "greeting_node")
@@ -311,7 +313,7 @@ graph.add_conditional_edges(
     },
 )
 
-graph = graph.compile()
+graph = graph.compile(cache=InMemoryCache())
 
 message = AgentState(name="John", numbers=[], counter=0)
 response = graph.invoke(message)
@@ -319,7 +321,7 @@ print(response["result"])
 print(f"Your generated numbers: {', '.join(str(v) for v in response['numbers'])}")
 
 # Display the graph
-display(Image(graph.get_graph().draw_mermaid_png()))
+show_graph(graph)
 
 
 # --------------------------------------------------------------
@@ -356,7 +358,8 @@ def guess_node(state: AgentState) -> AgentState:
     upper_bound = state["upper_bound"]
     lower_bound = state["lower_bound"]
 
-    guess = random.randint(lower_bound, upper_bound)
+    # Bisection: midpoint halves the range each attempt (<= 5 guesses for 1-20)
+    guess = (lower_bound + upper_bound) // 2
     state["guesses"].append(guess)
     state["attempts"] += 1
 
@@ -412,4 +415,4 @@ message = AgentState(name="John")
 response = graph.invoke(message)
 
 # Display the graph
-display(Image(graph.get_graph().draw_mermaid_png()))
+show_graph(graph)
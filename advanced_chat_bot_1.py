@@ -1,6 +1,8 @@
+import asyncio
 import sys
 from typing import Annotated, TypedDict
 
+import aiosqlite
 from dotenv import load_dotenv
 from IPython.display import Image, display
 from langchain_core.messages import (
@@ -11,9 +13,9 @@ from langchain_core.messages import (
 )
 from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import END, START, StateGraph
-from langgraph.graph.message import add_messages
+from langgraph.graph.message import REMOVE_ALL_MESSAGES, add_messages
 
 load_dotenv()
 
@@ -21,16 +23,32 @@ load_dotenv()
 # ==============================================================
 # Example 7: Chat Agent with Short-Term Memory (Manual Summarization)
 # ==============================================================
-# - Router triggers summarization when messages exceed threshold
-# - Summarizes all messages, keeps last 2, removes older ones
-# - InMemorySaver persists state across invocations
+# - Router triggers summarization when the history exceeds the input token budget
+# - Summarizes all messages, keeps the most recent ones that fit the budget verbatim
+# - Over budget only: filter model extracts what the last question needs from the history
+#   before it is summarized (one extra cheap call) | Notes sent with the verbatim window
+# - AsyncSqliteSaver (WAL journal) persists state across invocations and restarts
 
 MAX_SUMMARY_TOKENS = 256
-MESSAGE_THRESHOLD = 10
+MAX_FILTER_TOKENS = 400
+
+# Token budget for the history | Overhead reserves room for the prompts around it
+MAX_INPUT_TOKENS = 2000
+PROMPT_OVERHEAD_TOKENS = 200
+
+# System message is stored at index 0 of the history under a fixed id,
+# so summary updates replace it in place (add_messages merges by id)
+SYSTEM_PROMPT = "You are a helpful assistant."
+SYSTEM_MESSAGE_ID = "system"
+
+# Constant messages built once (reused every turn until a summary exists)
+BASE_SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT, id=SYSTEM_MESSAGE_ID)
+FIRST_SUMMARY_PROMPT = HumanMessage(content="Create a concise summary of the conversation above:")
 
 # Initialize models
 model = ChatOpenAI(model="gpt-4o-mini")
 summarization_model = model.bind(max_tokens=MAX_SUMMARY_TOKENS)
+filter_model = model.bind(max_tokens=MAX_FILTER_TOKENS)  # swap for a nano-tier model if available
 
 
 class AgentState(TypedDict):
@@ -38,32 +56,46 @@ class AgentState(TypedDict):
 
     messages: Annotated[list[BaseMessage], add_messages]
     summary: str
+    relevant_context: str
 
 
-def call_model_node(state: AgentState) -> dict:
-    """Node: calls LLM and returns response"""
+def filter_node(state: AgentState) -> dict:
+    """Node: extracts the history relevant to the last user message (cheap, capped output)
+    | Runs before summarization only, while the full history is still in state"""
 
-    full_history = state["messages"]
-    print(f"Full history length: {len(full_history)}")
+    # Earlier turns only | System message (index 0) and last user message are sent verbatim
+    earlier_messages = state["messages"][1:-1]
+    if not earlier_messages:
+        return {"relevant_context": ""}
 
-    system_prompt = "You are a helpful assistant."
-
-    # Build system message with summary if available
-    if summary := state.get("summary", ""):
-        system_content = (
-            f"{system_prompt}\n\nContext from earlier conversation:\n{summary}"
-            "Continue the conversation naturally using this context."
+    prompt_msg = HumanMessage(
+        content=(
+            f"The user now asks: {state['messages'][-1].text}\n\n"
+            "Extract only the information from the conversation above that is relevant "
+            "to this question, as concise notes. Reply with NONE if nothing is relevant."
         )
-    else:
-        system_content = system_prompt
+    )
+    response = filter_model.invoke(earlier_messages + [prompt_msg])
+    return {"relevant_context": response.text}
+
+
+def call_model_node(state: AgentState) -> dict:
+    """Node: calls LLM with the history (and filtered notes, if any) and returns response"""
 
-    # Inject system message dynamically | Not saved to messages
-    llm_messages = [SystemMessage(content=system_content)] + full_history
+    full_history = state["messages"]
+    print(f"Full history length: {len(full_history)}")
 
-    print(f"Sending {len(llm_messages)} messages to LLM")
+    # System message (incl. summary) + filtered notes + verbatim history
+    # (whole history under budget | kept recent window after summarization)
+    prompt = [full_history[0]]
+    if (context := state.get("relevant_context", "")) and context != "NONE":
+        prompt.append(SystemMessage(content=f"Relevant context from this conversation:\n{context}"))
+    prompt += full_history[1:]
+    print(f"Sending {len(prompt)} messages to LLM")
 
-    response = model.invoke(llm_messages)
-    return {"messages": [response]}
+    response = model.invoke(prompt)
+    # Notes belong to this turn only | Cleared so later turns under budget don't reuse them
+    return {"messages": [response], "relevant_context": ""}
 
 
 def summarize_history(state: AgentState) -> dict:
@@ -71,81 +103,126 @@ def summarize_history(state: AgentState) -> dict:
 
     messages = state["messages"]
 
-    messages_to_summarize = [msg for msg in messages if not isinstance(msg, SystemMessage)]
+    # System message is seeded once at index 0 | Skip it without scanning the history
+    has_system = bool(messages) and isinstance(messages[0], SystemMessage)
+    messages_to_summarize = messages[1:] if has_system else messages
 
     print(f"Summarizing {len(messages_to_summarize)} messages")
 
-    # Build summary prompt
+    # Build summary prompt (constant message unless a summary must be extended)
     if existing_summary := state.get("summary", ""):
-        prompt_msg = (
-            f"This is a summary of the conversation to date: {existing_summary}\n\n"
-            "Extend the summary by taking into account the new messages above."
+        prompt_msg = HumanMessage(
+            content=(
+                f"This is a summary of the conversation to date: {existing_summary}\n\n"
+                "Extend the summary by taking into account the new messages above."
+            )
         )
     else:
-        prompt_msg = "Create a concise summary of the conversation above:"
+        prompt_msg = FIRST_SUMMARY_PROMPT
 
     # Add prompt to ALL messages for summarization (LLM sees full context)
-    summary_input = messages_to_summarize + [HumanMessage(content=prompt_msg)]
+    summary_input = messages_to_summarize + [prompt_msg]
 
     # Generate summary
     response = summarization_model.invoke(summary_input)
     new_summary = response.content
 
-    # Delete all but the 2 most recent messages
-    delete_messages = [RemoveMessage(id=msg.id) for msg in messages_to_summarize[:-2]]  # type: ignore
-    print(f"Removing {len(delete_messages)} messages from history")
+    # Fold summary into the system message (same id, replaced in place at index 0)
+    system_message = SystemMessage(
+        content=(
+            f"{SYSTEM_PROMPT}\n\nContext from earlier conversation:\n{new_summary}\n\n"
+            "Continue the conversation naturally using this context."
+        ),
+        id=SYSTEM_MESSAGE_ID,
+    )
+
+    # Verbatim window: walk back from the newest message while the tail fits the budget
+    budget = MAX_INPUT_TOKENS - PROMPT_OVERHEAD_TOKENS - MAX_SUMMARY_TOKENS
+    start = len(messages_to_summarize) - 1  # latest message is always kept
+    used = model.get_num_tokens_from_messages([messages_to_summarize[start]])
+    while start > 0:
+        tokens = model.get_num_tokens_from_messages([messages_to_summarize[start - 1]])
+        if used + tokens > budget:
+            break
+        used += tokens
+        start -= 1
+
+    # Bulk reset: wipe the history once, then keep system message + the verbatim window
+    kept_messages = messages_to_summarize[start:]
+    print(f"Removing {len(messages_to_summarize) - len(kept_messages)} messages from history")
 
-    return {"summary": new_summary, "messages": delete_messages}
+    return {
+        "summary": new_summary,
+        "messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), system_message, *kept_messages],
+    }
 
 
 def should_continue(state: AgentState) -> str:
-    """Router: decide whether to summarize"""
-    if len(state["messages"]) > MESSAGE_THRESHOLD:
+    """Router: decide whether to summarize (history exceeds the input token budget)"""
+    history_tokens = model.get_num_tokens_from_messages(state["messages"])
+    if history_tokens > MAX_INPUT_TOKENS - PROMPT_OVERHEAD_TOKENS:
         return "summarize_conversation"
     return "generate_response"
 
 
 # Build graph
 graph = StateGraph(AgentState)
+graph.add_node("filter", filter_node)
 graph.add_node("call_model", call_model_node)
 graph.add_node("summarize", summarize_history)
 graph.add_conditional_edges(
     START,
     should_continue,
-    {"summarize_conversation": "summarize", "generate_response": "call_model"},
+    {"summarize_conversation": "filter", "generate_response": "call_model"},
 )
+graph.add_edge("filter", "summarize")
 graph.add_edge("summarize", "call_model")
 graph.add_edge("call_model", END)
 
-# Compile with checkpointer
-memory = InMemorySaver()
-agent = graph.compile(checkpointer=memory)
-
 # Thread ID tracks conversation
-config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+config: RunnableConfig = {"configurable": {"thread_id": "ex7"}}
 
 # Visualize graph if in interactive mode
 if hasattr(sys, "ps1"):
-    display(Image(agent.get_graph().draw_mermaid_png()))
+    display(Image(graph.compile().get_graph().draw_mermaid_png()))
 
 
-# Chat loop: only pass new messages, checkpointer handles history
+# Chat loop: async, input() runs in a worker thread so the event loop stays free
 # @traceable(name="chat_session", run_type="chain")
-def run_chatbot():
-    while True:
-        user_input = input("Enter: ")
-        if user_input.lower() == "exit":
-            break
-
-        response = agent.invoke({"messages": [HumanMessage(content=user_input)]}, config)  # type: ignore
-
-        # Show user msg if in interactive mode (only)
-        if hasattr(sys, "ps1"):
-            print(f"User: {user_input}")
-
-        last_message = response["messages"][-1]
-        print(f"Assistant: {last_message.content}\n")
+async def run_chatbot():
+    # Compile with checkpointer (SQLite on disk, WAL for fast concurrent writes)
+    async with aiosqlite.connect("chat.db") as conn:
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        agent = graph.compile(checkpointer=AsyncSqliteSaver(conn))
+
+        # New thread: seed the system message with the first turn (stays at index 0)
+        seed = []
+        if not (await agent.aget_state(config)).values:  # type: ignore
+            seed = [BASE_SYSTEM_MESSAGE]
+
+        while True:
+            user_input = await asyncio.to_thread(input, "Enter: ")
+            if user_input.lower() == "exit":
+                break
+
+            messages = [*seed, HumanMessage(content=user_input)]
+            seed = []
+
+            # Show user msg if in interactive mode (only)
+            if hasattr(sys, "ps1"):
+                print(f"User: {user_input}")
+
+            # Stream reply tokens as generated | Skip summarize node (also calls the LLM)
+            prefix = "Assistant: "
+            inputs = {"messages": messages}
+            stream = agent.astream(inputs, config, stream_mode="messages")  # type: ignore
+            async for chunk, metadata in stream:
+                if metadata["langgraph_node"] == "call_model":  # type: ignore
+                    print(f"{prefix}{chunk.content}", end="", flush=True)
+                    prefix = ""
+            print("\n")
 
 
 if __name__ == "__main__":
-    run_chatbot()
+    asyncio.run(run_chatbot())
@@ -1,12 +1,15 @@
+import asyncio
 import sys
 from typing import TypedDict
 
+import aiosqlite
+import tiktoken
 from dotenv import load_dotenv
 from IPython.display import Image, display
 from langchain_core.messages import AnyMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import START, MessagesState, StateGraph
 from langmem.short_term import RunningSummary, SummarizationNode
 
@@ -18,7 +21,7 @@ load_dotenv()
 # ==============================================================
 # - SummarizationNode auto-summarizes when exceeding token threshold
 # - Keeps recent messages + running summary within budget
-# - InMemorySaver persists state across invocations
+# - AsyncSqliteSaver (WAL journal) persists state across invocations and restarts
 
 
 MAX_SUMMARY_TOKENS = 256
@@ -29,6 +32,14 @@ MAX_TOKENS_BEFORE_SUMMARY = 600
 model = ChatOpenAI(model="gpt-4o-mini")
 summarization_model = model.bind(max_tokens=MAX_SUMMARY_TOKENS)
 
+# Tokenizer resolved once (Rust BPE) | Reused by every summarization check
+encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+
+
+def count_tokens(messages: list[AnyMessage]) -> int:
+    """Approximate chat token count: 4 tokens overhead per message + 3 for the reply primer"""
+    return 3 + sum(4 + len(encoding.encode(msg.text)) for msg in messages)
+
 
 class AgentState(MessagesState):
     context: dict[str, RunningSummary]
@@ -41,7 +52,7 @@ class LLMInputState(TypedDict):
 
 # Optimized summarization node configuration
 summarization_node = SummarizationNode(
-    token_counter=model.get_num_tokens_from_messages,  # type: ignore
+    token_counter=count_tokens,  # cached tiktoken encoder instead of per-call lookup
     model=summarization_model,  # LLM used for summarization
     max_tokens=MAX_TOKENS,  # total output token budget (summary + tail)
     max_tokens_before_summary=MAX_TOKENS_BEFORE_SUMMARY,  # trigger summarization when exceeding
@@ -61,35 +72,46 @@ builder.add_node("summarize", summarization_node)
 builder.add_edge(START, "summarize")
 builder.add_edge("summarize", "call_model")
 
-# Compile with checkpointer
-memory = InMemorySaver()
-agent = builder.compile(checkpointer=memory)
-
 # Thread ID tracks conversation
-config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+config: RunnableConfig = {"configurable": {"thread_id": "ex8"}}
 
 # Visualize graph if in interactive mode
 if hasattr(sys, "ps1"):
-    display(Image(agent.get_graph().draw_mermaid_png()))
+    display(Image(builder.compile().get_graph().draw_mermaid_png()))
 
 
-# Chat loop: only pass new messages, checkpointer handles history
+# Chat loop: async, input() runs in a worker thread so the event loop stays free
 # @traceable(name="chat_session", run_type="chain")
-def run_chatbot() -> dict | None:
+async def run_chatbot() -> dict | None:
     response = None
-    while True:
-        user_input = input("Enter: ")
-        if user_input.lower() == "exit":
-            break
-
-        response = agent.invoke({"messages": [HumanMessage(content=user_input)]}, config)  # type: ignore
-
-        # Show user msg if in interactive mode (only)
-        if hasattr(sys, "ps1"):
-            print(f"User: {user_input}")
 
-        last_message = response["messages"][-1]
-        print(f"Assistant: {last_message.content}\n")
+    # Compile with checkpointer (SQLite on disk, WAL for fast concurrent writes)
+    async with aiosqlite.connect("chat.db") as conn:
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        agent = builder.compile(checkpointer=AsyncSqliteSaver(conn))
+
+        while True:
+            user_input = await asyncio.to_thread(input, "Enter: ")
+            if user_input.lower() == "exit":
+                break
+
+            # Show user msg if in interactive mode (only)
+            if hasattr(sys, "ps1"):
+                print(f"User: {user_input}")
+
+            # Stream reply tokens as generated | Skip summarize node (also calls the LLM)
+            prefix = "Assistant: "
+            inputs = {"messages": [HumanMessage(content=user_input)]}
+            stream = agent.astream(inputs, config, stream_mode="messages")  # type: ignore
+            async for chunk, metadata in stream:
+                if metadata["langgraph_node"] == "call_model":  # type: ignore
+                    print(f"{prefix}{chunk.content}", end="", flush=True)
+                    prefix = ""
+            print("\n")
+
+            # Final state for show_conversation_context (read back from the checkpointer)
+            response = (await agent.aget_state(config)).values  # type: ignore
     return response
 
 
@@ -107,7 +129,7 @@ def show_conversation_context(response: dict):
 
 
 if __name__ == "__main__":
-    response = run_chatbot()
+    response = asyncio.run(run_chatbot())
 
     if response:
         user_input = input("Should we display the conversation context? (y/n): ")
@@ -31,15 +31,23 @@ Example flows:
 
 Note: Reject creates a loop because it sends feedback to the model without
 executing the tool, causing the model to generate a new tool call.
+
+Prompt layout (provider prefix caching):
+[static system prompt] → [committed history, starting with the incoming email] → [decision]
+Resumes only append, so the prefix stays byte-identical across the approve/edit/reject
+loop. Set DEBUG_PREFIX = True to verify this with a SHA-256 digest per resume.
 """
 
-import json
+import hashlib
 import sys
+from dataclasses import asdict, dataclass
 
+import httpx
+import orjson
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.agents.middleware import HumanInTheLoopMiddleware
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AnyMessage, HumanMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import InMemorySaver
@@ -48,10 +56,23 @@ from langgraph.types import Command
 load_dotenv()
 
 # Initialize agent components
-model = ChatOpenAI(model="gpt-4o-mini")
+# Keep idle connections for 2 min (httpx default: 5 s) -> the resume after human think time
+# reuses the open TLS connection instead of reconnecting
+http_client = httpx.Client(limits=httpx.Limits(keepalive_expiry=120), timeout=60)
+model = ChatOpenAI(model="gpt-4o-mini", http_client=http_client)
 memory = InMemorySaver()  # Required for state persistence during interrupts
 config = {"configurable": {"thread_id": "human-in-the-loop1"}}  # Required for conversation tracking
 
+# Static prefix: constant system prompt (no timestamps or per-turn interpolation)
+SYSTEM_PROMPT = "You are a helpful assistant that can send emails."
+DEBUG_PREFIX = False  # assert the cached prefix is unchanged after every resume
+
+
+def prefix_digest(messages: list[AnyMessage]) -> str:
+    """SHA-256 of the serialized prompt prefix (system prompt + committed messages)"""
+    payload = "\n".join([SYSTEM_PROMPT, *(message.model_dump_json() for message in messages)])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
 
 # Define tool
 @tool(parse_docstring=True)
@@ -73,11 +94,65 @@ def send_email(recipient: str, subject: str, body: str) -> str:
 agent = create_agent(
     model=model,
     tools=[send_email],
-    system_prompt="You are a helpful assistant that can send emails.",
+    system_prompt=SYSTEM_PROMPT,
     middleware=[HumanInTheLoopMiddleware(interrupt_on={"send_email": True})],
     checkpointer=memory,
 )
 
+
+# Resume payloads per decision (built once at import, looked up per interrupt)
+@dataclass(frozen=True)
+class EmailEdit:
+    """Edited send_email arguments for the edit decision"""
+
+    recipient: str
+    subject: str
+    body: str
+
+    def as_decision(self) -> dict:
+        edited_action = {"name": "send_email", "args": asdict(self)}
+        return {"decisions": [{"type": "edit", "edited_action": edited_action}]}
+
+
+APPROVE_DECISION = {"decisions": [{"type": "approve", "message": "Email approved."}]}
+EDIT_DECISION = EmailEdit(
+    recipient="partner@startup.com",
+    subject="Budget proposal for Q1 2026",
+    body="I can only approve up to 500k, please send over details.",
+).as_decision()
+REJECT_DECISION = {
+    "decisions": [{"type": "reject", "message": "Ask for more budget details first."}]
+}
+
+DECISIONS: dict[str, dict] = {
+    "approve": APPROVE_DECISION,
+    "edit": EDIT_DECISION,
+    "reject": REJECT_DECISION,
+}
+
+
+def stream_resume(command: Command) -> dict:
+    """Resume the agent, printing model tokens as they arrive | Returns the final state"""
+    result, interrupts = {}, None
+    stream_modes = ["messages", "updates", "values"]
+
+    # Tuple of (mode, data)
+    for mode, data in agent.stream(command, config=config, stream_mode=stream_modes):  # type: ignore
+        match mode:
+            case "messages":
+                token, metadata = data
+                if metadata["langgraph_node"] == "model":
+                    print(token.content, end="", flush=True)
+            case "updates":
+                interrupts = data.get("__interrupt__", interrupts)
+            case "values":
+                result = data
+    print()
+
+    # Same shape as invoke(): interrupts are reported under "__interrupt__"
+    return {**result, "__interrupt__": interrupts} if interrupts else result
+
+
 # Incoming email (example)
 incoming_email = """
 Respond to the following email:
@@ -87,8 +162,11 @@ Body: Hey Sydney, we need your sign-off on the $1M engineering budget for Q1.
 Can you approve and reply by EOD? This is critical for our timeline.
 """
 
+# Built once with a fixed id | Sent only on the first invoke, resumes carry decisions only
+INCOMING_EMAIL_MSG = HumanMessage(content=incoming_email, id="incoming-email")
+
 # Invoke agent with incoming email
-result = agent.invoke({"messages": [HumanMessage(content=incoming_email)]}, config=config)
+result = agent.invoke({"messages": [INCOMING_EMAIL_MSG]}, config=config)
 
 
 # Handle interrupts
@@ -96,44 +174,27 @@ while "__interrupt__" in result:
     action = result["__interrupt__"][0].value["action_requests"][0]
 
     print(f"\n📧 Approval needed: {action['name']}")
-    print(json.dumps(action["args"], indent=2))
+    print(orjson.dumps(action["args"], option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode())
+
+    # Committed prefix: everything before the interrupted tool call (edit may rewrite it)
+    committed = len(result["messages"]) - 1
+    digest = prefix_digest(result["messages"][:committed])
 
     decision = input("\nAction (approve/edit/reject): ")
 
-    match decision:
-        case "approve":
-            resume_decision = {"decisions": [{"type": "approve", "message": "Email approved."}]}
-
-        case "edit":
-            resume_decision = {
-                "decisions": [
-                    {
-                        "type": "edit",
-                        "edited_action": {
-                            "name": "send_email",
-                            "args": {
-                                "recipient": "partner@startup.com",
-                                "subject": "Budget proposal for Q1 2026",
-                                "body": "I can only approve up to 500k, please send over details.",
-                            },
-                        },
-                    }
-                ]
-            }
-
-        case "reject":
-            resume_decision = {
-                "decisions": [{"type": "reject", "message": "Ask for more budget details first."}]
-            }
-
-        case _:
-            print("Invalid action")
-            sys.exit(1)
-
-    # Resume execution with decision
-    result = agent.invoke(Command(resume=resume_decision), config=config)
-
-    for message in result["messages"]:
-        message.pretty_print()
+    resume_decision = DECISIONS.get(decision)
+    if resume_decision is None:
+        print("Invalid action")
+        sys.exit(1)
+
+    # Resume execution with decision (streamed)
+    result = stream_resume(Command(resume=resume_decision))
+
+    if DEBUG_PREFIX:
+        assert prefix_digest(result["messages"][:committed]) == digest, "Prompt prefix changed"
+
+        # History (incl. the email) comes from the checkpointer, not the resume payload
+        stored = memory.get_tuple(config).checkpoint["channel_values"]["messages"]  # type: ignore
+        assert stored[0].id == INCOMING_EMAIL_MSG.id, "Incoming email missing from checkpoint"
 
 print(f"Assistant: {result['messages'][-1].content}")
@@ -1,43 +1,53 @@
 """Models and Messages"""
 
-import json
-
+import orjson
+import warmup  # noqa: F401  (preload tiktoken + open the API connection in the background)
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.tools import tool
+from langchain_core.globals import get_llm_cache, set_llm_cache
 from langchain_core.messages import HumanMessage
+from model_factory import PromptCache, get_model
 
 load_dotenv()
 
+# Identical prompts are answered from memory (LRU, max 256 entries) instead of the API
+if get_llm_cache() is None:
+    set_llm_cache(PromptCache(maxsize=256))
+
 agent = create_agent(
-    model="openai:gpt-5-nano",
+    model=get_model("openai:gpt-5-nano"),
     system_prompt="You are a helpful assistant.",
 )
 
 message = HumanMessage(content="What is the capital of France?")
-response = agent.invoke({"messages": [message]})
-print(f"Assistant: {response['messages'][-1].content}\n")
 
 
 # ==============================================================
 # Alternative Formats
 # ==============================================================
-
-# Strings
-# -> Automatically converted to HumanMessage
-response = agent.invoke({"messages": "What is the capital of France?"})  # type: ignore
-print(f"Assistant: {response['messages'][-1].content}\n")
-
-
-# Dictionaries
-# -> Automatically converted to list of messages (HumanMessage, AIMessage)
-messages = [
-    {"role": "user", "content": "What is the capital of France?"},
-    {"role": "assistant", "content": "Paris"},
-    {"role": "user", "content": "What is its city population?"},
+# Independent requests -> sent concurrently in one batch call (max 3 in flight)
+
+inputs = [
+    # Messages
+    {"messages": [message]},
+    # Strings
+    # -> Automatically converted to HumanMessage
+    {"messages": "What is the capital of France?"},
+    # Dictionaries
+    # -> Automatically converted to list of messages (HumanMessage, AIMessage)
+    {
+        "messages": [
+            {"role": "user", "content": "What is the capital of France?"},
+            {"role": "assistant", "content": "Paris"},
+            {"role": "user", "content": "What is its city population?"},
+        ]
+    },
 ]
-response = agent.invoke({"messages": messages})  # type: ignore
-print(f"Assistant: {response['messages'][-1].content}\n")
+responses = agent.batch(inputs, config={"max_concurrency": 3})  # type: ignore
+
+for response in responses:
+    print(f"Assistant: {response['messages'][-1].content}\n")
 
 
 # ==============================================================
@@ -53,7 +63,7 @@ def add(a: int, b: int) -> int:
 
 
 agent = create_agent(
-    model="openai:gpt-5-nano",
+    model=get_model("openai:gpt-5-nano"),
     tools=[add],
     system_prompt="You are a helpful assistant. Use tools when relevant to answer the question.",
 )
@@ -73,7 +83,13 @@ for msg in response["messages"]:
 # Information
 # ==============================================================
 
+
+def jdump(obj) -> str:
+    """Pretty-print JSON (orjson, sorted keys for stable output)"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode()
+
+
 last_message = response["messages"][-1]
 print(f"Content: {last_message.content}\n")
-print(f"Usage Metadata: {json.dumps(last_message.usage_metadata, indent=2)}\n")
-print(f"Metadata: {json.dumps(last_message.response_metadata, indent=2)}\n")
+print(f"Usage Metadata: {jdump(last_message.usage_metadata)}\n")
+print(f"Metadata: {jdump(last_message.response_metadata)}\n")
@@ -7,16 +7,23 @@ Streamin modes:
 
 """
 
+import warmup  # noqa: F401  (preload tiktoken + open the API connection in the background)
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.tools import tool
+from langchain_core.globals import get_llm_cache, set_llm_cache
 from langchain_core.messages import HumanMessage
 from langgraph.config import get_stream_writer
+from model_factory import PromptCache, get_model
 
 load_dotenv()
 
+# Identical prompts are answered from memory (LRU, max 256 entries) instead of the API
+if get_llm_cache() is None:
+    set_llm_cache(PromptCache(maxsize=256))
+
 agent = create_agent(
-    model="openai:gpt-5-nano",
+    model=get_model("openai:gpt-5-nano"),
     system_prompt="You are an hilarious comedian.",
 )
 
@@ -68,7 +75,7 @@ def get_weather(city: str) -> str:
 
 
 agent = create_agent(
-    model="claude-sonnet-4-5-20250929",
+    model=get_model("anthropic:claude-sonnet-4-5-20250929"),
     tools=[get_weather],
     system_prompt="You are a helpful assistant.",
 )
@@ -12,16 +12,27 @@ Use Cases
 - Validated: Production use
 """
 
+import asyncio
+import operator
+from functools import cache
 from typing import Literal
 
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.tools import tool
+from langchain_core.globals import set_llm_cache
 from langchain_core.messages import HumanMessage
+from model_factory import SQLitePromptCache
 from pydantic import BaseModel, Field
 
 load_dotenv()
 
+# Shared dispatch table for the calculators (operation -> function)
+OPERATIONS = {"add": operator.add, "multiply": operator.mul}
+
+# Persistent LLM cache: re-runs answer the static prompts from disk (key: prompt + model + tools)
+set_llm_cache(SQLitePromptCache(database_path=".langchain.db"))
+
 # ==============================================================
 # Approach 1: Basic Tool (Minimal)
 # ==============================================================
@@ -31,12 +42,9 @@ load_dotenv()
 def basic_calculator(a: float, b: float, operation: Literal["add", "multiply"]) -> float:
     """Basic arithmetic operations."""
     print("🧮 Basic calculator called")
-    if operation == "add":
-        return a + b
-    elif operation == "multiply":
-        return a * b
-    else:
+    if operation not in OPERATIONS:
         raise ValueError(f"Unsupported operation: {operation}")
+    return OPERATIONS[operation](a, b)
 
 
 # ==============================================================
@@ -63,12 +71,9 @@ def documented_calculator(a: float, b: float, operation: Literal["add", "multipl
         ValueError: If an unsupported operation is provided
     """
     print("📚 Documented calculator called")
-    if operation == "add":
-        return a + b
-    elif operation == "multiply":
-        return a * b
-    else:
+    if operation not in OPERATIONS:
         raise ValueError(f"Unsupported operation: {operation}")
+    return OPERATIONS[operation](a, b)
 
 
 # ==============================================================
@@ -90,12 +95,9 @@ def validated_calculator(a, b, operation) -> float:
     Numbers are constrained to the range [-1000, 1000].
     """
     print("✅ Validated calculator called")
-    if operation == "add":
-        return a + b
-    elif operation == "multiply":
-        return a * b
-    else:
+    if operation not in OPERATIONS:
         raise ValueError(f"Unsupported operation: {operation}")
+    return OPERATIONS[operation](a, b)
 
 
 # ==============================================================
@@ -103,31 +105,42 @@ def validated_calculator(a, b, operation) -> float:
 # ==============================================================
 
 
-def test_tool_approaches():
-    """Test each tool approach with the same input."""
+TOOL_APPROACHES = {
+    "Basic Tool": [basic_calculator],
+    "Documented Tool": [documented_calculator],
+    "Validated Tool": [validated_calculator],
+}
+
+
+@cache
+def get_agent(approach_name: str):
+    """Build the agent once per approach (tool schemas are generated on creation)"""
+    return create_agent(
+        model="openai:gpt-4o-mini",
+        tools=TOOL_APPROACHES[approach_name],
+        system_prompt="You are a helpful math assistant. Use the available calculator tool.",
+    )
+
 
-    tools_to_test = [
-        ("Basic Tool", [basic_calculator]),
-        ("Documented Tool", [documented_calculator]),
-        ("Validated Tool", [validated_calculator]),
-    ]
+async def test_tool_approaches():
+    """Test each tool approach with the same input (all approaches run concurrently)."""
+
+    # Build all agents up front -> only the model calls overlap below
+    agents = {approach_name: get_agent(approach_name) for approach_name in TOOL_APPROACHES}
 
     message = HumanMessage(content="What is 7 times 6?")
 
-    for approach_name, tools in tools_to_test:
+    # Independent requests -> total latency of the slowest one instead of the sum
+    responses = await asyncio.gather(
+        *(agent.ainvoke({"messages": [message]}) for agent in agents.values())
+    )
+
+    for approach_name, response in zip(agents, responses, strict=True):
         print(f"\n{'=' * 50}")
         print(f"Testing: {approach_name}")
         print(f"{'=' * 50}")
-
-        agent = create_agent(
-            model="openai:gpt-4o-mini",
-            tools=tools,
-            system_prompt="You are a helpful math assistant. Use the available calculator tool.",
-        )
-
-        response = agent.invoke({"messages": [message]})
         print(f"Assistant: {response['messages'][-1].content}")
 
 
 if __name__ == "__main__":
-    test_tool_approaches()
+    asyncio.run(test_tool_approaches())
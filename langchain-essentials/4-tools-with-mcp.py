@@ -5,19 +5,31 @@ Demonstrates using Model Context Protocol (MCP) tools with LangChain agents.
 MCP enables external tools/services integration via standardized protocol.
 
 Requires async: use await agent.ainvoke() instead of agent.invoke().
+
+Sessions: client.get_tools() opens a new session per tool call (stdio -> new npx process).
+Tools loaded from client.session() reuse one session (one process) for all calls.
+Set MCP_TIME_URL to use a long-running server over streamable_http instead of stdio.
 """
 
 import asyncio
+import os
+from contextlib import suppress
 
 import nest_asyncio
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.messages import HumanMessage
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
 
-nest_asyncio.apply()
 load_dotenv()
 
+# Jupyter/IPython already runs an event loop -> patch it so asyncio.run() works inside it.
+# As a plain script there is no running loop: asyncio stays unpatched (C tasks, no re-entrancy).
+with suppress(RuntimeError):
+    asyncio.get_running_loop()
+    nest_asyncio.apply()
+
 
 async def main():
     """Main async function to handle MCP tool integration."""
@@ -26,37 +38,40 @@ async def main():
     # MCP Client Setup
     # ==============================================================
 
-    mcp_client = MultiServerMCPClient(
-        {
-            "time": {
-                "transport": "stdio",
-                "command": "npx",
-                "args": ["-y", "@theo.foobar/mcp-time"],
-            }
+    if url := os.getenv("MCP_TIME_URL"):  # e.g. http://localhost:8000/mcp
+        time_server = {"transport": "streamable_http", "url": url}
+    else:
+        time_server = {
+            "transport": "stdio",
+            "command": "npx",
+            "args": ["-y", "@theo.foobar/mcp-time"],
         }
-    )
 
-    # ==============================================================
-    # Load MCP Tools and Create Agent
-    # ==============================================================
-
-    mcp_tools = await mcp_client.get_tools()
-    print(f"Loaded {len(mcp_tools)} MCP tools: {[t.name for t in mcp_tools]}")
-
-    agent = create_agent(
-        model="openai:gpt-4o-mini",
-        tools=mcp_tools,
-        system_prompt="You are a helpful assistant. Use format: YYYY-MM-DD HH:MM:SS for time.",
-    )
+    mcp_client = MultiServerMCPClient({"time": time_server})
 
     # ==============================================================
-    # Test MCP Tools
+    # Load MCP Tools and Create Agent
     # ==============================================================
-
-    message = HumanMessage(
-        content="What is the current time? Convert it to the timezone of Sydney?"
-    )
-    response = await agent.ainvoke({"messages": [message]})
+    # One persistent session -> the server process is started once and reused by every tool call
+
+    async with mcp_client.session("time") as session:
+        mcp_tools = await load_mcp_tools(session)
+        print(f"Loaded {len(mcp_tools)} MCP tools: {[t.name for t in mcp_tools]}")
+
+        agent = create_agent(
+            model="openai:gpt-4o-mini",
+            tools=mcp_tools,
+            system_prompt="You are a helpful assistant. Use format: YYYY-MM-DD HH:MM:SS for time.",
+        )
+
+        # ==============================================================
+        # Test MCP Tools
+        # ==============================================================
+
+        message = HumanMessage(
+            content="What is the current time? Convert it to the timezone of Sydney?"
+        )
+        response = await agent.ainvoke({"messages": [message]})
 
     print(f"Assistant: {response['messages'][-1].content}")
 
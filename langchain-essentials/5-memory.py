@@ -8,18 +8,21 @@ Context injection: context_schema enables automatic runtime context injection
 into tools via ToolRuntime[Schema]. Context provided at invoke time.
 """
 
+import zlib
 from dataclasses import dataclass
-from pathlib import Path
 
-import requests
+from db_shared import DENY_RE, get_engine, run_query
 from dotenv import load_dotenv
-from IPython.display import Image, display
 from langchain.agents import create_agent
+from langchain.agents.middleware import SummarizationMiddleware
 from langchain.tools import ToolRuntime, tool
-from langchain_community.utilities import SQLDatabase
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from sqlalchemy import Engine
+
+from graph_cache import show_graph
 
 load_dotenv()
 
@@ -27,38 +30,26 @@ load_dotenv()
 # Database Setup
 # ==============================================================
 
-# Download Chinook database if needed
-url = "https://storage.googleapis.com/benchmarks-artifacts/chinook/Chinook.db"
-local_path = Path("Chinook.db")
-
-if local_path.exists():
-    print(f"{local_path} already exists, skipping download.")
-else:
-    response = requests.get(url)
-    if response.status_code == 200:
-        local_path.write_bytes(response.content)
-        print(f"File downloaded and saved as {local_path}")
-    else:
-        print(f"Failed to download the file. Status code: {response.status_code}")
-
-db = SQLDatabase.from_uri("sqlite:///Chinook.db")
+db = get_engine()  # Shared read-only engine (downloaded if missing, built once per process)
 
 # ==============================================================
 # Context and Tools
 # ==============================================================
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DataBase:
-    db: SQLDatabase
+    db: Engine
 
 
 @tool
 def execute_sql(query: str, runtime: ToolRuntime[DataBase]):
     """Execute a SQLite command and return results."""
+    if DENY_RE.search(query):  # rejected up front, no database round trip
+        return "Error: DML/DDL detected. Only read-only queries are permitted."
     db = runtime.context.db
     try:
-        return db.run(query)
+        return run_query(db, query)  # cached per normalized query
     except Exception as e:
         return f"Error executing SQL query: {e}"
 
@@ -79,22 +70,47 @@ Rules:
 - Output the result in clear simple language.
 """
 
+
+class CompressedSerializer(JsonPlusSerializer):
+    """Checkpoint serde: default msgpack encoding + zlib (level 1) -> smaller stored blobs"""
+
+    def dumps_typed(self, obj):
+        type_, data = super().dumps_typed(obj)
+        return f"{type_}+zlib", zlib.compress(data, 1)
+
+    def loads_typed(self, data):
+        type_, blob = data
+        if type_.endswith("+zlib"):
+            return super().loads_typed((type_.removesuffix("+zlib"), zlib.decompress(blob)))
+        return super().loads_typed(data)
+
+
+# Bounded context: once the history exceeds ~2000 tokens, older messages are replaced
+# by one summary message and only the last 10 are kept (tool call/result pairs stay intact)
+summarization = SummarizationMiddleware(
+    model="openai:gpt-4o-mini",
+    max_tokens_before_summary=2000,
+    messages_to_keep=10,
+)
+
 agent = create_agent(
     model="openai:gpt-4o-mini",
     tools=[execute_sql],
     system_prompt=SYSTEM_PROMPT,
     context_schema=DataBase,
-    checkpointer=InMemorySaver(),  # Enables memory/persistence
+    middleware=[summarization],
+    checkpointer=InMemorySaver(serde=CompressedSerializer()),  # Enables memory/persistence
 )
 
 # Visualize the graph
-display(Image(agent.get_graph().draw_mermaid_png()))
+show_graph(agent)  # PNG cached on disk per graph topology
 
 # ==============================================================
 # Interactive Chat with Memory
 # ==============================================================
 
 config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+context = DataBase(db=db)  # Same runtime context for every turn
 
 print("🤖 SQL Agent with Memory - Ask questions about the Chinook database!")
 print("💡 The agent will remember our conversation. Type 'exit' to quit.\n")
@@ -104,13 +120,17 @@ while True:
     if user_input.lower() == "exit":
         break
 
+    # Messages mode: tokens as they are generated (model node only, no tool output/summaries)
     message = [HumanMessage(content=user_input)]
     response = agent.stream(
         {"messages": message},  # type: ignore
         config=config,
-        context=DataBase(db=db),
-        stream_mode="values",
+        context=context,
+        stream_mode="messages",
     )
 
-    for step in response:
-        step["messages"][-1].pretty_print()
+    print("AI: ", end="")
+    for chunk, metadata in response:
+        if metadata["langgraph_node"] == "model":  # type: ignore
+            print(chunk.content, end="", flush=True)  # type: ignore
+    print("\n")
@@ -9,17 +9,24 @@ Three strategies for structured output:
 Supports: Pydantic models, dataclasses, TypedDict, JSON schema
 """
 
+import asyncio
 from dataclasses import dataclass
-from typing import TypedDict, Union
+from types import UnionType
+from typing import TypedDict, Union, get_origin
 
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain.agents.structured_output import ProviderStrategy, ToolStrategy
 from langchain_core.messages import HumanMessage
+from model_factory import get_model
 from pydantic import BaseModel, Field
 
 load_dotenv()
 
+# One chat model (and pooled HTTP client) shared by all agents below
+MODEL_NAME = "openai:gpt-4o-mini"
+model = get_model(MODEL_NAME)
+
 contact_message = (
     "John Smith from ABC Corp can be reached via email at john@abc.com or by phone at 555-0123."
 )
@@ -79,7 +86,7 @@ class EventInfo(BaseModel):
 # ==============================================================
 
 agent_provider = create_agent(
-    model="openai:gpt-4o-mini",
+    model=model,
     system_prompt="You are a helpful assistant. Extract the required contact information.",
     response_format=ProviderStrategy(ContactInfo),
 )
@@ -89,7 +96,7 @@ agent_provider = create_agent(
 # ==============================================================
 
 agent_tool = create_agent(
-    model="openai:gpt-4o-mini",
+    model=model,
     system_prompt="You are a helpful assistant. Extract the required contact information.",
     response_format=ToolStrategy(ContactInfo),
 )
@@ -99,18 +106,53 @@ agent_tool = create_agent(
 # ==============================================================
 
 agent_auto = create_agent(
-    model="openai:gpt-4o-mini",
+    model=model,
     system_prompt="You are a helpful assistant. Extract the required contact information.",
     response_format=ContactInfo,  # Auto-selects best strategy
 )
 
+# ==============================================================
+# Schema Types: One Agent per Schema (built once)
+# ==============================================================
+
+
+def response_format_for(model_name: str, schema):
+    """Native structured output for OpenAI (single schema), tool calling otherwise (e.g. Union)"""
+    if model_name.startswith("openai:") and get_origin(schema) not in (Union, UnionType):
+        return ProviderStrategy(schema)
+    return ToolStrategy(schema)
+
+
+SCHEMA_TESTS = [
+    ("Pydantic Model", ContactInfo, contact_message),
+    ("Dataclass", ContactDataclass, contact_message),
+    ("TypedDict", ContactDict, contact_message),
+    ("JSON Schema", contact_json_schema, contact_message),
+    ("Union Types", Union[ContactInfo, EventInfo], event_message),
+]
+
+SCHEMA_AGENTS = {
+    name: create_agent(
+        model=model,
+        system_prompt="Extract information from the given text.",
+        response_format=response_format_for(MODEL_NAME, schema),
+    )
+    for name, schema, _ in SCHEMA_TESTS
+}
+
+# Union result type -> label (one lookup instead of an isinstance chain)
+UNION_LABELS = {
+    ContactInfo: "Agent chose ContactInfo schema",
+    EventInfo: "Agent chose EventInfo schema",
+}
+
 # ==============================================================
 # Test All Approaches
 # ==============================================================
 
 
-def test_structured_output():
-    """Test each strategy with the same input."""
+async def test_structured_output():
+    """Test each strategy with the same input (all strategies run concurrently)."""
 
     strategies = [
         ("ProviderStrategy", agent_provider),
@@ -118,12 +160,16 @@ def test_structured_output():
         ("Auto-select", agent_auto),
     ]
 
-    for name, agent in strategies:
+    message = HumanMessage(content=contact_message)
+    responses = await asyncio.gather(
+        *(agent.ainvoke({"messages": [message]}) for _, agent in strategies)
+    )
+
+    for (name, _), response in zip(strategies, responses, strict=True):
         print(f"\n{'=' * 50}")
         print(f"Testing: {name}")
         print(f"{'=' * 50}")
 
-        response = agent.invoke({"messages": [HumanMessage(content=contact_message)]})
         contact = response["structured_response"]
 
         print("Structured Response:")
@@ -136,31 +182,24 @@ def test_structured_output():
         print(response["messages"][-1].content)
 
 
-def test_schema_types():
-    """Test different schema types with ToolStrategy."""
-
-    schemas = [
-        ("Pydantic Model", ContactInfo, contact_message),
-        ("Dataclass", ContactDataclass, contact_message),
-        ("TypedDict", ContactDict, contact_message),
-        ("JSON Schema", contact_json_schema, contact_message),
-        ("Union Types", Union[ContactInfo, EventInfo], event_message),
-    ]
+async def test_schema_types():
+    """Test different schema types (ProviderStrategy where supported, else ToolStrategy)."""
 
     print(f"\n{'=' * 60}")
     print("Testing Different Schema Types")
     print(f"{'=' * 60}")
 
-    for name, schema, test_message in schemas:
-        print(f"\n{name}:")
-
-        agent = create_agent(
-            model="openai:gpt-4o-mini",
-            system_prompt="Extract information from the given text.",
-            response_format=ToolStrategy(schema),
+    # Independent requests -> total latency of the slowest one instead of the sum
+    responses = await asyncio.gather(
+        *(
+            SCHEMA_AGENTS[name].ainvoke({"messages": [HumanMessage(content=test_message)]})
+            for name, _, test_message in SCHEMA_TESTS
         )
+    )
+
+    for (name, _, _), response in zip(SCHEMA_TESTS, responses, strict=True):
+        print(f"\n{name}:")
 
-        response = agent.invoke({"messages": [HumanMessage(content=test_message)]})
         result = response["structured_response"]
 
         print(f"  Result: {result}")
@@ -168,15 +207,12 @@ def test_schema_types():
 
         # Show which schema was chosen for Union
         if name == "Union Types":
-            if isinstance(result, ContactInfo):
-                print("  → Agent chose ContactInfo schema")
-            elif isinstance(result, EventInfo):
-                print("  → Agent chose EventInfo schema")
+            print("  →", UNION_LABELS.get(type(result), "Agent chose an unknown schema"))
 
 
 if __name__ == "__main__":
     # Test the three strategies
-    test_structured_output()
+    asyncio.run(test_structured_output())
 
     # Test different schema types (including Union)
-    test_schema_types()
+    asyncio.run(test_schema_types())
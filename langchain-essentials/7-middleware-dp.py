@@ -10,27 +10,30 @@ Key Concepts:
 - Context-aware prompting: Different prompts for different user types
 """
 
+import asyncio
 from dataclasses import dataclass
 
+from db_shared import DENY_RE, get_db
 from dotenv import load_dotenv
-from IPython.display import Image, display
 from langchain.agents import create_agent
 from langchain.agents.middleware import ModelRequest, dynamic_prompt
 from langchain.tools import ToolRuntime, tool
 from langchain_community.utilities import SQLDatabase
 from langchain_core.messages import HumanMessage
 
+from graph_cache import show_graph
+
 load_dotenv()
 
 # Initialize the database
-db = SQLDatabase.from_uri("sqlite:///Chinook.db")
+db = get_db()  # Shared read-only instance (engine + reflection built once per process)
 
 # ==============================================================
 # Context Schema
 # ==============================================================
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DataBase:
     """Context containing user permissions and database access."""
 
@@ -47,6 +50,8 @@ class DataBase:
 def execute_sql(query: str, runtime: ToolRuntime[DataBase]):
     """Execute a SQLite command and return results."""
     print("🔍 Executing SQL query")
+    if DENY_RE.search(query):  # rejected up front, no database round trip
+        return "Error: DML/DDL detected. Only read-only queries are permitted."
     db = runtime.context.db
     try:
         return db.run(query)
@@ -72,18 +77,21 @@ Rules:
 """
 
 
+# Only two possible prompts -> render both once (byte-identical per user type, prefix-cacheable)
+EMPLOYEE_PROMPT = SYSTEM_PROMPT_TEMPLATE.format(
+    table_access_restrictions="You have full access to all database tables."
+)
+CUSTOMER_PROMPT = SYSTEM_PROMPT_TEMPLATE.format(
+    table_access_restrictions=(
+        "RESTRICTED: Access only these tables: Album, Artist, Genre, Playlist, Track."
+    )
+)
+
+
 @dynamic_prompt
 def dynamic_system_prompt(request: ModelRequest) -> str:
     """Dynamically adjust system prompt based on user permissions."""
-
-    if request.runtime.context.is_employee:
-        table_access_restrictions = "You have full access to all database tables."
-    else:
-        table_access_restrictions = (
-            "RESTRICTED: Access only these tables: Album, Artist, Genre, Playlist, Track."
-        )
-
-    return SYSTEM_PROMPT_TEMPLATE.format(table_access_restrictions=table_access_restrictions)
+    return EMPLOYEE_PROMPT if request.runtime.context.is_employee else CUSTOMER_PROMPT
 
 
 # ==============================================================
@@ -98,7 +106,7 @@ agent = create_agent(
 )
 
 # Visualize the graph
-display(Image(agent.get_graph().draw_mermaid_png()))
+show_graph(agent)  # PNG cached on disk per graph topology
 
 # ==============================================================
 # Test Dynamic Prompting
@@ -106,7 +114,7 @@ display(Image(agent.get_graph().draw_mermaid_png()))
 
 
 # Test the dynamic prompting
-def test_dynamic_prompting():
+async def test_dynamic_prompting():
     """Test the agent with different user contexts to demonstrate dynamic prompting."""
 
     test_cases = [
@@ -116,19 +124,23 @@ def test_dynamic_prompting():
 
     message = "What is the most costly overall purchase by the customer Frank Harris?"
 
-    for case in test_cases:
-        print(f"\nTesting: {case['user_type']} Access\n")
-
-        context = DataBase(is_employee=case["is_employee"], db=db)
-
-        response = agent.stream(
-            {"messages": [HumanMessage(content=message)]}, context=context, stream_mode="values"
+    # Independent runs (no shared thread) -> both contexts run concurrently
+    responses = await asyncio.gather(
+        *(
+            agent.ainvoke(
+                {"messages": [HumanMessage(content=message)]},
+                context=DataBase(is_employee=case["is_employee"], db=db),
+            )
+            for case in test_cases
         )
+    )
+
+    for case, response in zip(test_cases, responses, strict=True):
+        print(f"\nTesting: {case['user_type']} Access\n")
 
-        # Debug the agent output
-        for step in response:
-            step["messages"][-1].pretty_print()
+        # Debug the agent output | whole transcript rendered first, then written once
+        print("\n".join(msg.pretty_repr() for msg in response["messages"]), flush=True)
 
 
 if __name__ == "__main__":
-    test_dynamic_prompting()
+    asyncio.run(test_dynamic_prompting())
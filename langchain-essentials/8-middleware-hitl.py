@@ -1,7 +1,8 @@
+import asyncio
 from dataclasses import dataclass
 
+from db_shared import DENY_RE, get_db
 from dotenv import load_dotenv
-from IPython.display import Image, display
 from langchain.agents import create_agent
 from langchain.agents.middleware import HumanInTheLoopMiddleware
 from langchain.tools import ToolRuntime, tool
@@ -9,19 +10,21 @@ from langchain_community.utilities import SQLDatabase
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.types import Command
 
+from graph_cache import show_graph
+
 load_dotenv()
 
 # ==============================================================
 # Database Setup
 # ==============================================================
 
-db = SQLDatabase.from_uri("sqlite:///Chinook.db")
+db = get_db()  # Shared read-only instance (engine + reflection built once per process)
 
 
 # ==============================================================
 # Context Schema
 # ==============================================================
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DataBase:
     db: SQLDatabase
 
@@ -35,6 +38,8 @@ class DataBase:
 @tool
 def execute_sql(query: str, runtime: ToolRuntime[DataBase]):
     """Execute a SQLite command and return results."""
+    if DENY_RE.search(query):  # rejected up front, no database round trip
+        return "Error: DML/DDL detected. Only read-only queries are permitted."
     db = runtime.context.db
     try:
         return db.run(query)
@@ -77,7 +82,7 @@ agent = create_agent(
 )
 
 # Visualize the graph
-display(Image(agent.get_graph().draw_mermaid_png()))
+show_graph(agent)  # PNG cached on disk per graph topology
 
 
 # ==============================================================
@@ -85,57 +90,94 @@ display(Image(agent.get_graph().draw_mermaid_png()))
 # ==============================================================
 
 
-def reject_scenario():
+async def astream_turn(payload, config: dict, scenario: str) -> dict:
+    """Run one turn, printing model output line by line as it arrives | Returns the final state"""
+    result, interrupts = {}, None
+    # Scenarios run concurrently -> every line printed whole, labelled with its scenario
+    label = f"Assistant ({scenario}):"
+    line, message_id = "", None
+    stream_modes = ["messages", "updates", "values"]
+    stream = agent.astream(
+        payload,
+        config=config,
+        context=DataBase(db=db),
+        stream_mode=stream_modes,  # type: ignore
+    )
+
+    # Tuple of (mode, data)
+    async for mode, data in stream:
+        match mode:
+            case "messages":
+                token, metadata = data
+                if metadata["langgraph_node"] == "model" and token.text:
+                    if token.id != message_id and line:  # new model message -> new line
+                        print(label, line, flush=True)
+                        line = ""
+                    message_id = token.id
+                    *lines, line = (line + token.text).split("\n")
+                    for text in lines:
+                        print(label, text, flush=True)
+            case "updates":
+                interrupts = data.get("__interrupt__", interrupts)
+            case "values":
+                result = data
+    if line:
+        print(label, line, flush=True)
+
+    # Same shape as ainvoke(): interrupts are reported under "__interrupt__"
+    return {**result, "__interrupt__": interrupts} if interrupts else result
+
+
+async def reject_scenario():
     """Test reject scenario."""
 
     config = {"configurable": {"thread_id": "1"}}
 
-    response = agent.invoke(
+    response = await astream_turn(
         {"messages": [{"role": "user", "content": "What are the names of all the employees?"}]},
-        config=config,  # type: ignore
-        context=DataBase(db=db),
+        config,
+        "reject",
     )
 
     if "__interrupt__" in response:
         action = response["__interrupt__"][-1].value["action_requests"][-1]
 
-        print(f"\033[1;3;31mInterrupt:{action['description']}\033[0m\n")
+        print(f"\033[1;3;31mInterrupt (reject):{action['description']}\033[0m")
 
-        response = agent.invoke(
+        response = await astream_turn(
             Command(
                 resume={"decisions": [{"type": "reject", "message": "the database is offline."}]}
             ),
-            config=config,  # type: ignore
-            context=DataBase(db=db),
+            config,
+            "reject",
         )
 
-    print(f"Assistant: {response['messages'][-1].content}")
 
-
-def approve_scenario():
+async def approve_scenario():
     """Test approve scenario."""
 
     config = {"configurable": {"thread_id": "2"}}
 
-    response = agent.invoke(
+    response = await astream_turn(
         {"messages": [{"role": "user", "content": "What are the names of all the employees?"}]},
-        config=config,  # type: ignore
-        context=DataBase(db=db),
+        config,
+        "approve",
     )
 
     while "__interrupt__" in response:
         action = response["__interrupt__"][-1].value["action_requests"][-1]
 
-        print(f"\033[1;3;31mInterrupt:{action['description']}\033[0m\n")
+        print(f"\033[1;3;31mInterrupt (approve):{action['description']}\033[0m")
 
-        response = agent.invoke(
-            Command(resume={"decisions": [{"type": "approve"}]}),
-            config=config,  # type: ignore
-            context=DataBase(db=db),
+        response = await astream_turn(
+            Command(resume={"decisions": [{"type": "approve"}]}), config, "approve"
         )
-    print(f"Assistant: {response['messages'][-1].content}")
+
+
+async def main():
+    """Run both scenarios concurrently (separate threads -> independent checkpoints)."""
+    await asyncio.gather(reject_scenario(), approve_scenario())
 
 
 if __name__ == "__main__":
-    reject_scenario()
-    approve_scenario()
+    asyncio.run(main())
@@ -1,52 +1,51 @@
+import asyncio
+import sys
+import time
 from dataclasses import dataclass
-from pathlib import Path
 
-import requests
+from db_shared import DENY_RE, get_engine, run_query
 from dotenv import load_dotenv
-from IPython.display import Image, display
 from langchain.agents import create_agent
 from langchain.tools import ToolRuntime, tool
-from langchain_community.utilities import SQLDatabase
-from langchain_core.messages import HumanMessage
+from langchain_core.globals import set_llm_cache
+from langchain_core.messages import AIMessageChunk, HumanMessage
+from langchain_openai import OpenAIEmbeddings
+from model_factory import SemanticCache, SQLitePromptCache
+from sqlalchemy import Engine
 
-load_dotenv()
+from graph_cache import show_graph
 
+load_dotenv()
 
-# Download the database file if it doesn't exist
-url = "https://storage.googleapis.com/benchmarks-artifacts/chinook/Chinook.db"
-local_path = Path("Chinook.db")
+# Persistent LLM cache: repeated prompts (e.g. schema discovery) are answered from disk
+set_llm_cache(SQLitePromptCache(database_path=".langchain.db"))
 
-if local_path.exists():
-    print(f"{local_path} already exists, skipping download.")
-else:
-    response = requests.get(url)
-    if response.status_code == 200:
-        local_path.write_bytes(response.content)
-        print(f"File downloaded and saved as {local_path}")
-    else:
-        print(f"Failed to download the file. Status code: {response.status_code}")
 
-# Initialize the database
-db = SQLDatabase.from_uri("sqlite:///Chinook.db")
+# Initialize the database (read-only: immutable file, no locking, pooled connections)
+db = get_engine()  # Shared engine (downloaded if missing, built once per process)
 
 
 # Define the data structure for the database
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DataBase:
-    db: SQLDatabase
+    db: Engine
 
 
 # Define the tool to execute SQL queries
 @tool
 def execute_sql(query: str, runtime: ToolRuntime[DataBase]):
     """Execute a SQLite command and return results."""
+    if DENY_RE.search(query):  # rejected up front, no database round trip
+        return "Error: DML/DDL detected. Only read-only queries are permitted."
     db = runtime.context.db
     try:
-        return db.run(query)
+        return run_query(db, query)  # cached per normalized query
     except Exception as e:
         return f"Error executing SQL query: {e}"
 
 
+# Static prompt prefix: module-level constant, never interpolated per turn
+# -> System prompt + tool schemas serialize byte-identically on every call (prefix caching)
 SYSTEM_PROMPT = """You are a helpful SQLite analyst.
 
 Rules:
@@ -59,16 +58,21 @@ Rules:
 - Output the result in clear simple language.
 """
 
+# Tools in deterministic (name) order -> stable tool schema block in the prompt prefix
+TOOLS = sorted([execute_sql], key=lambda t: t.name)
+
 # Create the agent
+# -> OpenAI caches stable prompt prefixes automatically (no cache_control markers needed)
 agent = create_agent(
     model="openai:gpt-5-mini",
-    tools=[execute_sql],
+    tools=TOOLS,
     system_prompt=SYSTEM_PROMPT,
     context_schema=DataBase,
 )
 
-# Visualize the graph
-display(Image(agent.get_graph().draw_mermaid_png()))
+# Visualize the graph (interactive mode only)
+# -> Rendered PNG cached on disk per graph topology, skips the Mermaid web call on reruns
+show_graph(agent)
 
 # Test the agent
 messages = [
@@ -78,20 +82,98 @@ messages = [
     "Find the artist with the most tracks",
 ]
 
+# Token streaming: model tokens printed in batches (>= 50 chars or every 100 ms) -> first words
+# show up right away, without one print call per token | Tool calls (the SQL) and tool results
+# printed as they arrive
+FLUSH_CHARS = 50
+FLUSH_INTERVAL = 0.1  # seconds
+
+
+def stream_answer(question: str) -> None:
+    """Run the agent on a question, printing the answer as it is generated"""
+    stream = agent.stream(
+        {"messages": [HumanMessage(content=question)]},
+        context=DataBase(db=db),
+        stream_mode="messages",
+    )
+
+    buffer, line_open, flush_at = "", False, time.monotonic() + FLUSH_INTERVAL
+    calls = None  # tool calls of the current model turn (streamed chunks merged)
+    for chunk, metadata in stream:  # type: ignore
+        if metadata["langgraph_node"] == "tools":
+            if buffer or line_open:
+                print(buffer)
+            buffer, line_open = "", False
+            if calls is not None:  # model turn complete -> full tool call arguments
+                for call in calls.tool_calls:
+                    print(f"🔧 {call['name']}: {call['args']}")
+                calls = None
+            chunk.pretty_print()
+            continue
+
+        if isinstance(chunk, AIMessageChunk) and chunk.tool_call_chunks:
+            calls = chunk if calls is None else calls + chunk
+        elif chunk.tool_calls:  # whole message, not streamed (e.g. served from the LLM cache)
+            calls = chunk
+        buffer += chunk.text
+        if buffer and (len(buffer) >= FLUSH_CHARS or time.monotonic() >= flush_at):
+            print(buffer, end="", flush=True)
+            buffer, line_open, flush_at = "", True, time.monotonic() + FLUSH_INTERVAL
+    if buffer or line_open:
+        print(buffer, flush=True)
+
+
 message = messages[3]
-response = agent.stream(
-    {"messages": [HumanMessage(content=message)]},
-    context=DataBase(db=db),
-    stream_mode="values",
-)
+print(f"Q: {message}")
+stream_answer(message)
+
+
+# ==============================================================
+# Concurrent Questions (Async)
+# ==============================================================
+# Independent questions -> run concurrently, total time ~ slowest question instead of sum
+# Opt-in (every example question is a full agent run): python create_agent.py --concurrent
+
+
+async def ask_all(questions: list[str]) -> list[dict]:
+    """Run all questions concurrently (independent runs, no checkpointer -> no shared state)"""
+    return await asyncio.gather(
+        *[
+            agent.ainvoke({"messages": [HumanMessage(content=question)]}, context=DataBase(db=db))
+            for question in questions
+        ]
+    )
+
+
+if __name__ == "__main__" and "--concurrent" in sys.argv:
+    for question, response in zip(messages, asyncio.run(ask_all(messages)), strict=True):
+        print(f"Q: {question}\nA: {response['messages'][-1].content}\n")
+
+
+# ==============================================================
+# Semantic Cache
+# ==============================================================
+# Keyed on the user question only (not the full message history) to maximize hits
+# -> Paraphrases above the similarity threshold reuse the stored answer
+# Opt-in (embedding calls + agent runs): python create_agent.py --semantic-cache
+
+
+def ask(question: str) -> str:
+    """Run the agent on a single question and return the final answer"""
+    response = agent.invoke({"messages": [HumanMessage(content=question)]}, context=DataBase(db=db))
+    return response["messages"][-1].text
+
 
-# Debug the agent
-for step in response:
-    step["messages"][-1].pretty_print()
+if __name__ == "__main__" and "--semantic-cache" in sys.argv:
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    semantic_cache = SemanticCache(embeddings, threshold=0.85)
+    for question in [messages[0], "Which table has the most rows?"]:
+        print(f"Q: {question}\nA: {semantic_cache.get_or_compute(question, ask)}\n")
 
 
 # Key Notes:
-# - agent.stream() returns a lazy stream, consumed step-by-step in the loop
+# - agent.stream() returns a lazy stream, consumed token-by-token in stream_answer()
 # - Agent discovers database schema independently (no pre-loaded schema)
 # - Error messages enable self-correction of SQL queries
 # - Agent doesn't retain schema knowledge between invocations
+#   (but repeated LLM calls and SQL queries are served from the caches)
@@ -0,0 +1,41 @@
+"""
+Graph Cache
+
+Graph visualization without a Mermaid web call on every run:
+- PNG rendered once per graph topology, cached on disk (.graph-cache/)
+- Shown in interactive mode only (sys.ps1 set), skipped for script runs
+- IPython / Mermaid rendering imported on first use only (faster script start-up)
+
+Same file in the repo root, langchain-essentials/ and langgraph-essentials/: each script
+imports it from its own directory (keep the copies identical).
+
+"""
+
+import hashlib
+import sys
+from functools import cache
+from pathlib import Path
+
+GRAPH_CACHE_DIR = Path(".graph-cache")
+
+
+@cache
+def graph_png(mermaid_syntax: str) -> bytes:
+    """Render Mermaid syntax to PNG, cached on disk by SHA-256 of the syntax (and in memory)"""
+    path = GRAPH_CACHE_DIR / f"{hashlib.sha256(mermaid_syntax.encode()).hexdigest()}.png"
+    if not path.exists():
+        from langchain_core.runnables.graph_mermaid import draw_mermaid_png  # noqa: PLC0415
+
+        GRAPH_CACHE_DIR.mkdir(exist_ok=True)
+        path.write_bytes(draw_mermaid_png(mermaid_syntax))
+    return path.read_bytes()
+
+
+def show_graph(graph) -> None:
+    """Display the graph (or agent) in interactive mode only (skipped for script runs)"""
+    if not hasattr(sys, "ps1"):
+        return
+
+    from IPython.display import Image, display  # noqa: PLC0415
+
+    display(Image(graph_png(graph.get_graph().draw_mermaid())))
@@ -0,0 +1,119 @@
+"""
+Model Factory
+
+Shared chat model instances for the examples:
+- Same model + settings -> same instance (one HTTP client and connection pool)
+- Settings are normalized, so keyword order does not create a new instance
+- OpenAI models share one pooled httpx client (keep-alive connections, closed at exit)
+
+PromptCache / SQLitePromptCache: LLM response caches for agents (memory / on disk)
+- Agent state assigns every message a fresh id, which ends up in the cache key
+- Ids are dropped from the key, so identical conversations hit the cache
+
+SemanticCache: question -> answer cache matched by embedding similarity
+- Paraphrased questions ("largest table" vs "table with most rows") hit as well
+
+"""
+
+import atexit
+from collections.abc import Callable
+from contextlib import suppress
+from functools import lru_cache
+from typing import Any
+
+import httpx
+import numpy as np
+import orjson
+from langchain.chat_models import init_chat_model
+from langchain_community.cache import SQLiteCache
+from langchain_core.caches import RETURN_VAL_TYPE, InMemoryCache
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from sqlalchemy.exc import IntegrityError
+
+# Shared connection pool for OpenAI models (Anthropic caches its own client per process)
+http_client = httpx.Client(
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    timeout=30,
+)
+atexit.register(http_client.close)
+
+
+@lru_cache(maxsize=32)
+def _cached_model(model: str, settings: frozenset[tuple[str, Any]]) -> BaseChatModel:
+    """Initialize the chat model once per (model, settings) key"""
+    kwargs = dict(settings)
+    if model.startswith("openai:"):
+        kwargs.setdefault("http_client", http_client)
+    return init_chat_model(model, **kwargs)
+
+
+def get_model(model: str, **kwargs: Any) -> BaseChatModel:
+    """Return the shared chat model, e.g. get_model("openai:gpt-5-nano", temperature=0)"""
+    return _cached_model(model, frozenset(kwargs.items()))
+
+
+class _IgnoreMessageIds:
+    """Cache mixin: keys on message content, ignoring message ids"""
+
+    @staticmethod
+    def _normalize(prompt: str) -> str:
+        """Drop message ids from the serialized chat prompt"""
+        try:
+            messages = orjson.loads(prompt)  # runs on every model call -> C parser/serializer
+        except orjson.JSONDecodeError:
+            return prompt  # Plain text prompt (non-chat model)
+
+        for message in messages:
+            message.get("kwargs", {}).pop("id", None)
+        return orjson.dumps(messages, option=orjson.OPT_SORT_KEYS).decode()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        return super().lookup(self._normalize(prompt), llm_string)  # type: ignore
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        super().update(self._normalize(prompt), llm_string, return_val)  # type: ignore
+
+
+class PromptCache(_IgnoreMessageIds, InMemoryCache):
+    """In-memory LLM cache (LRU with maxsize), lost when the process exits"""
+
+
+class SQLitePromptCache(_IgnoreMessageIds, SQLiteCache):
+    """SQLite LLM cache, persists responses across runs (default: .langchain.db)"""
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        # Concurrent identical calls race to insert the same key -> first writer wins
+        with suppress(IntegrityError):
+            super().update(prompt, llm_string, return_val)
+
+
+class SemanticCache:
+    """Answer cache keyed on question embeddings (one cache per agent / system prompt)"""
+
+    def __init__(self, embeddings: Embeddings, threshold: float = 0.85, maxsize: int = 256):
+        self.embeddings = embeddings
+        self.threshold = threshold  # minimum cosine similarity for a hit
+        self.maxsize = maxsize
+        self._vectors = np.empty((0, 0), dtype=np.float32)  # unit vectors, one row per entry
+        self._answers: list[str] = []
+
+    def get_or_compute(self, question: str, compute: Callable[[str], str]) -> str:
+        """Return the answer of the most similar cached question, else compute and store it"""
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        vector /= np.linalg.norm(vector)
+
+        if self._answers:
+            scores = self._vectors @ vector  # cosine similarity (unit vectors)
+            best = int(scores.argmax())
+            if scores[best] >= self.threshold:
+                return self._answers[best]
+
+        answer = compute(question)
+
+        # Evict the oldest entry when full
+        if len(self._answers) >= self.maxsize:
+            self._vectors, self._answers = self._vectors[1:], self._answers[1:]
+        self._vectors = np.vstack([self._vectors, vector]) if self._answers else vector[None, :]
+        self._answers.append(answer)
+        return answer
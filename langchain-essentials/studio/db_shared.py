@@ -0,0 +1,174 @@
+"""
+Shared Database
+
+One Chinook database per process for the SQL demos (create_agent, memory, middleware, studio):
+- Downloaded once if missing (streamed to disk, temp file + rename)
+- Engine, connection pool and table reflection are set up once (lru_cache)
+- Read-only: immutable file (no locking), writes rejected per connection
+- Pooled connections keep their page cache warm across queries
+- Query results cached per normalized query (comments, case, whitespace ignored)
+
+Same file in studio/: the LangGraph project root is studio/ (langgraph.json), so the Studio
+graphs can only import modules inside it (keep the copies identical).
+
+"""
+
+import hashlib
+import os
+import re
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import requests
+from langchain_community.utilities import SQLDatabase
+from sqlalchemy import CursorResult, Engine, create_engine, event
+
+CHINOOK_URL = "https://storage.googleapis.com/benchmarks-artifacts/chinook/Chinook.db"
+CHINOOK_PATH = Path("Chinook.db")
+CHINOOK_URI = f"sqlite:///file:{CHINOOK_PATH}?mode=ro&immutable=1&uri=true"
+# Upstream digest, if pinned | Otherwise the digest of the first download is recorded next to
+# the file (Chinook.db.sha256) and checked on every later start
+CHINOOK_SHA256: str | None = None
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# Write statements (the read-only connection would reject them anyway)
+DENY_RE = re.compile(r"\b(INSERT|UPDATE|DELETE|ALTER|DROP|CREATE|REPLACE|TRUNCATE)\b", re.I)
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file (read in chunks, not loaded into memory)"""
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def is_valid(path: Path, sha256: str | None) -> bool:
+    """SQLite file header, plus the SHA-256 digest when one is known"""
+    with path.open("rb") as f:
+        if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+            return False
+    return sha256 is None or file_sha256(path) == sha256
+
+
+def download(url: str, path: Path) -> None:
+    """Stream the file to disk in 1 MiB chunks | Temp file + rename, no partial files"""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with requests.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        with tmp_path.open("wb") as f:
+            shutil.copyfileobj(response.raw, f, length=1 << 20)
+    os.replace(tmp_path, path)
+
+
+def ensure_chinook() -> Path:
+    """Download the Chinook database if it is missing or fails the checksum (raises if the
+    fresh download fails it too) | Records the digest on first use"""
+    digest_path = CHINOOK_PATH.with_name(f"{CHINOOK_PATH.name}.sha256")
+    expected = CHINOOK_SHA256 or (digest_path.read_text().strip() if digest_path.exists() else None)
+    if CHINOOK_PATH.exists() and is_valid(CHINOOK_PATH, expected):
+        print(f"{CHINOOK_PATH} already exists, skipping download.")
+    else:
+        download(CHINOOK_URL, CHINOOK_PATH)
+        if not is_valid(CHINOOK_PATH, CHINOOK_SHA256):
+            CHINOOK_PATH.unlink()
+            raise ValueError(f"Checksum mismatch for {CHINOOK_PATH} downloaded from {CHINOOK_URL}")
+        print(f"File downloaded and saved as {CHINOOK_PATH}")
+        expected = None  # fresh download -> (re)record its digest
+    if expected is None:
+        digest_path.write_text(file_sha256(CHINOOK_PATH))
+    return CHINOOK_PATH
+
+
+def set_sqlite_pragmas(dbapi_connection, _connection_record):
+    """Per-connection pragmas: reject writes, mmap reads (256 MiB), 64 MiB page cache"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """Return the shared read-only Chinook engine (downloaded and created on first call)"""
+    ensure_chinook()
+    engine = create_engine(
+        CHINOOK_URI,
+        pool_size=8,
+        connect_args={"check_same_thread": False},  # pooled, shared across threads
+    )
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+@lru_cache(maxsize=1)
+def get_db() -> SQLDatabase:
+    """Return the shared Chinook database (created on first call)"""
+    return SQLDatabase(get_engine())
+
+
+@lru_cache(maxsize=1)
+def load_schema() -> str:
+    """Table info cached on disk, keyed by DB size + mtime | Skips reflection on later imports"""
+    stat = CHINOOK_PATH.stat()
+    cache_path = CHINOOK_PATH.with_name(
+        f"{CHINOOK_PATH.stem}.schema.{stat.st_size}-{int(stat.st_mtime)}.txt"
+    )
+    if cache_path.exists():
+        return cache_path.read_text()
+    schema = get_db().get_table_info()
+    cache_path.write_text(schema)
+    return schema
+
+
+# ==============================================================
+# Query Cache
+# ==============================================================
+# Read-only queries on a static database are deterministic -> cache results per query
+# (no invalidation needed: the connection rejects writes)
+
+MAX_VALUE_CHARS = 300  # per value in tool output (SQLDatabase default)
+QUERY_CACHE_SIZE = 256
+SQL_LITERAL_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+# Literals matched first, so comment markers inside quotes are left alone
+SQL_COMMENT_RE = re.compile(rf"{SQL_LITERAL_RE.pattern}|--[^\n]*|/\*.*?(?:\*/|\Z)", re.S)
+
+_query_cache: dict[tuple[Engine, str], str] = {}
+
+
+def normalize_sql(query: str) -> str:
+    """Cache key of a query: comments dropped, whitespace collapsed and lowercased outside
+    quoted literals (the key only, the query runs as written)"""
+    query = SQL_COMMENT_RE.sub(lambda m: m.group(1) or " ", query)
+    parts = SQL_LITERAL_RE.split(query)
+    parts[::2] = [re.sub(r"\s+", " ", part).lower() for part in parts[::2]]  # outside literals
+    return "".join(parts).strip()
+
+
+def to_tsv(result: CursorResult) -> str:
+    """Rows as TSV: header line + one line per row (fewer tokens than the list-of-tuples repr)
+    | Values truncated to MAX_VALUE_CHARS, as SQLDatabase.run() does"""
+    rows = result.all() if result.returns_rows else []
+    if not rows:
+        return ""
+    lines = ["\t".join(result.keys())]
+    lines += [
+        "\t".join(" ".join(str(value).split())[:MAX_VALUE_CHARS] for value in row) for row in rows
+    ]
+    return "\n".join(lines)
+
+
+def run_query(engine: Engine, query: str) -> str:
+    """Run a query as written, cached per (engine, normalized query) | Errors are raised, so
+    they are not cached"""
+    key = (engine, normalize_sql(query))
+    if (cached := _query_cache.get(key)) is not None:
+        return cached
+    with engine.connect() as connection:
+        result = to_tsv(connection.exec_driver_sql(query))  # raw SQL, no bind-parameter parsing
+    if len(_query_cache) >= QUERY_CACHE_SIZE:
+        _query_cache.pop(next(iter(_query_cache)), None)  # evict the oldest entry
+    _query_cache[key] = result
+    return result
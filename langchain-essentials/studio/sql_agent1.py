@@ -1,79 +1,34 @@
 """SQL agent for studio."""
 
-import pathlib
-import re
-
-import requests
+from db_shared import get_engine, load_schema, run_query
 from langchain.agents import create_agent
 from langchain.chat_models import init_chat_model
-from langchain_community.utilities import SQLDatabase
 from langchain_core.messages import SystemMessage
 from langchain_core.tools import tool
+from sql_guard import safe_sql
 
 llm = init_chat_model("openai:gpt-5")
 
-# Get the database, store it locally
-
-url = "https://storage.googleapis.com/benchmarks-artifacts/chinook/Chinook.db"
-local_path = pathlib.Path("Chinook.db")
-
-if local_path.exists():
-    print(f"{local_path} already exists, skipping download.")
-else:
-    response = requests.get(url)
-    if response.status_code == 200:
-        local_path.write_bytes(response.content)
-        print(f"File downloaded and saved as {local_path}")
-    else:
-        print(f"Failed to download the file. Status code: {response.status_code}")
-
-db = SQLDatabase.from_uri("sqlite:///Chinook.db")
-
-# print(f"Dialect: {db.dialect}")
-# print(f"Available tables: {db.get_usable_table_names()}")
-# print(f'Sample output: {db.run("SELECT * FROM Artist LIMIT 5;")}')
-
-SCHEMA = db.get_table_info()
-
-DENY_RE = re.compile(
-    r"\b(INSERT|UPDATE|DELETE|ALTER|DROP|CREATE|REPLACE|TRUNCATE)\b", re.I
-)
-HAS_LIMIT_TAIL_RE = re.compile(r"(?is)\blimit\b\s+\d+(\s*,\s*\d+)?\s*;?\s*$")
-
-
-def _safe_sql(q: str) -> str:
-    # normalize
-    q = q.strip()
-    # block multiple statements (allow one optional trailing ;)
-    if q.count(";") > 1 or (q.endswith(";") and ";" in q[:-1]):
-        return "Error: multiple statements are not allowed."
-    q = q.rstrip(";").strip()
-
-    # read-only gate
-    if not q.lower().startswith("select"):
-        return "Error: only SELECT statements are allowed."
-    if DENY_RE.search(q):
-        return "Error: DML/DDL detected. Only read-only queries are permitted."
-
-    # append LIMIT only if not already present at the end (robust to whitespace/newlines)
-    if not HAS_LIMIT_TAIL_RE.search(q):
-        q += " LIMIT 5"
-    return q
+# Database: shared instance from db_shared (downloaded if missing, one engine per process)
+SCHEMA = load_schema()
 
 
+# Read-only gate (sql_guard): one SELECT statement, no DML/DDL, LIMIT 5 unless already limited
 @tool
 def execute_sql(query: str) -> str:
     """Execute a READ-ONLY SQLite SELECT query and return results."""
-    query = _safe_sql(query)
+    query = safe_sql(query)
     q = query
     if q.startswith("Error:"):
         return q
     try:
-        return db.run(q)
+        return run_query(get_engine(), q)  # retried queries (any case/spacing) skip SQLite
     except Exception as e:
         return f"Error: {e}"
 
 
+# Static prompt prefix: built once at import, identical on every call (schema + rules, no
+# per-run values) -> cached by the provider after the first request
 SYSTEM_PROMPT = f"""You are a careful SQLite analyst.
 
 Authoritative schema (do not invent columns/tables):
@@ -91,6 +46,8 @@ Rules:
 """
 
 
+# OpenAI caches stable prompt prefixes (>= 1024 tokens, the schema alone exceeds it)
+# automatically -> no cache_control markers or caching middleware needed
 agent = create_agent(
     model=llm,
     tools=[execute_sql],
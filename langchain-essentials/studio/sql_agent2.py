@@ -1,12 +1,8 @@
 """SQL agent for studio."""
 
-import pathlib
-import re
-
-import requests
+from db_shared import get_engine, run_query
 from langchain.agents import create_agent
 from langchain.chat_models import init_chat_model
-from langchain_community.utilities import SQLDatabase
 from langchain_core.messages import SystemMessage
 from langchain_core.tools import tool
 
@@ -14,15 +10,15 @@ llm = init_chat_model("openai:gpt-5")
 
 # database is from:
 # url = "https://storage.googleapis.com/benchmarks-artifacts/chinook/Chinook.db"
+# -> shared instance from db_shared (downloaded if missing, one engine per process)
 
-db = SQLDatabase.from_uri("sqlite:///Chinook.db")
 
 @tool
 def execute_sql(query: str) -> str:
     """Execute a query and return results."""
 
     try:
-        return db.run(query)
+        return run_query(get_engine(), query)  # retried queries (any case/spacing) skip SQLite
     except Exception as e:
         return f"Error: {e}"
 
@@ -0,0 +1,63 @@
+"""
+SQL Guard
+
+Read-only gate for the studio SQL agent (sql_agent1), without regex alternation/backtracking:
+- One SELECT statement only (one optional trailing ;)
+- DML/DDL keywords rejected via one word split + set lookups
+- LIMIT 5 appended unless the query already ends with "LIMIT n" or "LIMIT n, m"
+
+"""
+
+import re
+from functools import lru_cache
+
+DENY_WORDS = frozenset(
+    {"INSERT", "UPDATE", "DELETE", "ALTER", "DROP", "CREATE", "REPLACE", "TRUNCATE"}
+)
+NON_WORD_RE = re.compile(r"\W+")  # word boundaries as in \b (letters, digits, underscore)
+# Words split on the same boundaries, every other non-space character is a token of its own
+# -> "(SELECT ...)LIMIT 5" ends in LIMIT, 5 | "... LIMIT 5)" ends in 5, )
+SQL_TOKEN_RE = re.compile(r"\w+|\S")
+LIMIT_TOKENS = 2  # LIMIT n
+LIMIT_OFFSET_TOKENS = 4  # LIMIT n , m
+
+
+def has_denied_word(q: str) -> bool:
+    # one split into words, then set lookups (no per-keyword alternation/backtracking)
+    return not DENY_WORDS.isdisjoint(NON_WORD_RE.split(q.upper()))
+
+
+def has_limit_tail(q: str) -> bool:
+    # query ends with "LIMIT n" or "LIMIT n, m" (only the last 4 tokens are looked at)
+    tail = SQL_TOKEN_RE.findall(q)[-LIMIT_OFFSET_TOKENS:]
+    if len(tail) >= LIMIT_TOKENS and tail[-2].lower() == "limit" and tail[-1].isdecimal():
+        return True
+    return (
+        len(tail) == LIMIT_OFFSET_TOKENS
+        and tail[0].lower() == "limit"
+        and tail[1].isdecimal()
+        and tail[2] == ","
+        and tail[3].isdecimal()
+    )
+
+
+@lru_cache(maxsize=1024)  # pure function of the query -> retried queries skip validation
+def safe_sql(q: str) -> str:
+    # normalize
+    q = q.strip()
+    # block multiple statements (allow one optional trailing ;) | first ; must be the last char
+    semicolon = q.find(";")
+    if semicolon != -1 and semicolon != len(q) - 1:
+        return "Error: multiple statements are not allowed."
+    q = q.rstrip(";").strip()
+
+    # read-only gate
+    if not q.lower().startswith("select"):
+        return "Error: only SELECT statements are allowed."
+    if has_denied_word(q):
+        return "Error: DML/DDL detected. Only read-only queries are permitted."
+
+    # append LIMIT only if not already present at the end (robust to whitespace/newlines)
+    if not has_limit_tail(q):
+        q += " LIMIT 5"
+    return q
@@ -0,0 +1,46 @@
+"""Parity of the tokenized LIMIT tail check with the regex it replaced."""
+
+import re
+
+import pytest
+from sql_guard import has_limit_tail, safe_sql
+
+# Previous implementation (sql_agent1.py before the tokenized scan)
+HAS_LIMIT_TAIL_RE = re.compile(r"(?is)\blimit\b\s+\d+(\s*,\s*\d+)?\s*;?\s*$")
+
+QUERIES = [
+    "SELECT Name FROM Artist LIMIT 5",
+    "SELECT Name FROM Artist limit 10, 20",
+    "SELECT Name FROM Artist LIMIT 10 ,20",
+    "SELECT Name FROM Artist LIMIT\n5",
+    "SELECT Name FROM Artist",
+    "SELECT Name FROM Artist LIMIT",
+    "SELECT Name FROM Artist LIMIT 5,",
+    "SELECT Name FROM Artist LIMIT x",
+    "SELECT Name FROM Artist LIMIT 5a",
+    "SELECT Name FROM Artist LIMIT5",
+    "SELECT Name FROM Artist xLIMIT 5",
+    "SELECT Name FROM Artist x_LIMIT 5",
+    'SELECT "t"LIMIT 5',
+    "SELECT * FROM Artist WHERE ArtistId IN (SELECT ArtistId FROM Album)LIMIT 5",
+    "SELECT * FROM (SELECT Name FROM Artist LIMIT 5)",
+    "SELECT Name FROM Artist LIMIT/**/5",
+    "SELECT 'LIMIT 5'",
+    "LIMIT 5",
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_has_limit_tail_matches_regex(query):
+    assert has_limit_tail(query) == bool(HAS_LIMIT_TAIL_RE.search(query))
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM Artist WHERE ArtistId IN (SELECT ArtistId FROM Album)LIMIT 5",
+        'SELECT "t"LIMIT 5;',
+    ],
+)
+def test_safe_sql_keeps_existing_limit(query):
+    assert safe_sql(query) == query.rstrip(";")
@@ -0,0 +1,33 @@
+"""
+Warmup
+
+Import once, before building agents, to pay one-time setup costs in the background:
+- tiktoken: load the o200k_base encoding (token counting for gpt-4o / gpt-5 models)
+- httpx: open the TLS connection to the OpenAI API in the shared pool (see model_factory)
+
+Best effort: runs in a daemon thread, failures (offline, no API key) are ignored.
+Note: init_chat_model itself does not touch tiktoken, only token counting does.
+
+"""
+
+import os
+import threading
+from contextlib import suppress
+
+import tiktoken
+from dotenv import load_dotenv
+from model_factory import http_client
+
+load_dotenv()  # OPENAI_BASE_URL may come from .env
+
+
+def _warmup() -> None:
+    """Preload the encoding and keep one connection alive in the pool"""
+    with suppress(Exception):
+        tiktoken.encoding_for_model("gpt-4o")  # cached by tiktoken for the process
+    with suppress(Exception):
+        base_url = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        http_client.head(base_url)  # response is irrelevant, the connection is kept
+
+
+threading.Thread(target=_warmup, name="warmup", daemon=True).start()
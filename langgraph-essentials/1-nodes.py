@@ -20,19 +20,22 @@ Execution:
 
 from typing import Annotated, TypedDict
 
-from IPython.display import Image, display
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 
+from graph_cache import show_graph
+
+# Model client created once, reused on every node call (one connection pool)
+model = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+
 
 class AgentState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
 
 
 def agent_node(state: AgentState) -> AgentState:
-    model = ChatOpenAI(model="gpt-4o-mini", temperature=0)
     response = model.invoke(state["messages"])
     return {"messages": [response]}
 
@@ -48,5 +51,5 @@ response = graph.invoke({"messages": [HumanMessage(content="What is the capital
 print(response["messages"][-1].content)
 
 # Display the graph
-display(Image(graph.get_graph().draw_mermaid_png()))
+show_graph(graph)  # PNG cached on disk per graph topology
 # print(graph.get_graph().draw_mermaid())
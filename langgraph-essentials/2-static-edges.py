@@ -24,9 +24,10 @@ State Management:
 import operator
 from typing import Annotated, TypedDict
 
-from IPython.display import Image, display
 from langgraph.graph import END, START, StateGraph
 
+from graph_cache import show_graph
+
 
 class AgentState(TypedDict):
     nlist: Annotated[list[str], operator.add]
@@ -77,7 +78,7 @@ builder.add_edge("e", END)
 
 # Compile and display the graph
 graph = builder.compile()
-display(Image(graph.get_graph().draw_mermaid_png()))
+show_graph(graph)  # PNG cached on disk per graph topology
 
 # Invoke the graph
 initial_state = AgentState(nlist=["Initial String"])
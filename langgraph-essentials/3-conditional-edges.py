@@ -17,10 +17,11 @@ Both approaches achieve the same result - choose based on preference and complex
 import operator
 from typing import Annotated, Literal, TypedDict
 
-from IPython.display import Image, display
 from langgraph.graph import END, START, StateGraph
 from langgraph.types import Command
 
+from graph_cache import show_graph
+
 # ==============================================================
 # Approach 1: Conditional Edges with Separate Router
 # ==============================================================
@@ -49,12 +50,13 @@ def node_c_basic(state: AgentState) -> AgentState:
     return AgentState(nlist=["c"])
 
 
+# Input -> next node, both cases listed (built once, no .lower() per call) | Unknown -> END
+ROUTE_MAP = {"b": "b", "B": "b", "c": "c", "C": "c", "q": END, "Q": END}
+
+
 def route_decision(state: AgentState) -> Literal["b", "c", END]:
     """Route based on last input in state."""
-    last_input = state["nlist"][-1].lower()
-
-    route_map = {"b": "b", "c": "c", "q": END}
-    next_node = route_map.get(last_input, END)
+    next_node = ROUTE_MAP.get(state["nlist"][-1], END)
     print(f"🎯 Routing to node {next_node}")
     return next_node
 
@@ -93,17 +95,7 @@ def node_a_command(state: AgentState) -> Command[Literal["b", "c", END]]:
     """Entry node with built-in routing logic."""
     print("🚀 Starting at node A (Command approach)")
 
-    last_input = state["nlist"][-1].lower()
-
-    if last_input == "b":
-        next_node = "b"
-    elif last_input == "c":
-        next_node = "c"
-    elif last_input == "q":
-        next_node = END
-    else:
-        next_node = END
-
+    next_node = ROUTE_MAP.get(state["nlist"][-1], END)  # same table as route_decision
     print(f"🎯 Routing to node{next_node}")
     return Command(goto=[next_node])
 
@@ -153,7 +145,7 @@ def test_conditional_edges():
     graph = create_conditional_edge_graph()
 
     # Visualize the graph
-    display(Image(graph.get_graph().draw_mermaid_png()))
+    show_graph(graph)  # PNG cached on disk per graph topology
 
     # Test cases
     test_cases = ["b", "c", "q", "invalid"]
@@ -179,7 +171,7 @@ def test_command_routing():
     graph = create_command_graph()
 
     # Visualize the graph
-    display(Image(graph.get_graph().draw_mermaid_png()))
+    show_graph(graph)  # PNG cached on disk per graph topology
 
     # Test cases
     test_cases = ["b", "c", "q", "invalid"]